@@ -0,0 +1,279 @@
+"""
+Mux episodes from Python without the command line.
+
+    from muxkt.api import mux_episodes
+
+    for result in mux_episodes("komi", [4, 5, 12], jobs=2):
+        print(result["episode"], result["ok"], result["outputs"])
+
+Nothing is printed and nothing is asked. Problems that stop the batch from
+starting raise a MuxktError; episodes that fail to mux are returned with
+their failures.
+"""
+
+import configparser
+import os
+import re
+import tempfile
+from shutil import which
+from typing import Callable
+
+import click
+
+from .eta import Durations
+from .events import (
+    configuration_cache_enabled,
+    episode_events,
+    read_events,
+    write_init_script,
+)
+from .logs import archive_log, episode_log
+from .parsing import (
+    find_transient_failures,
+    parse_failures,
+    parse_success,
+    parse_warnings,
+)
+from .scheduler import Scheduler, resolve_jobs, run_commands
+from .tasks import build_command, find_missing_tasks
+from .utils import arc_name, get_app_files
+
+
+class MuxktError(Exception):
+    """Base class of the errors raised by the API."""
+
+
+class ProjectNotFoundError(MuxktError):
+    """The project is not in the config or its path does not exist."""
+
+
+class DependencyError(MuxktError):
+    """A program that muxing needs is not installed."""
+
+
+class TaskNotFoundError(MuxktError):
+    """
+    The mux task of some episodes does not exist.
+
+    Attributes:
+        suggestions (dict[str, list[str]]): Closest existing episodes keyed by every episode that does not exist.
+    """
+
+    def __init__(self, project: str, suggestions: dict[str, list[str]]) -> None:
+        self.suggestions = suggestions
+        super().__init__(
+            f"Tasks not found in project '{project}': "
+            + ", ".join(f"mux.{name}" for name in suggestions)
+        )
+
+
+def load_config(
+    config_dir: str | None = None,
+) -> tuple[configparser.ConfigParser, dict]:
+    """
+    Read the config of muxkt.
+
+    Args:
+        config_dir (str | None): Config folder of muxkt; None for the one the command line uses.
+
+    Returns:
+        configparser.ConfigParser: The config.
+        dict: Paths of the files muxkt keeps in the config folder.
+    """
+
+    config_dir = config_dir or click.get_app_dir("muxkt")
+    os.makedirs(config_dir, exist_ok=True)
+    files = get_app_files(config_dir)
+
+    config = configparser.ConfigParser()
+    config.read(files["config_file"])
+    return config, files | {"config_file_path": config_dir}
+
+
+def mux_episodes(
+    project: str,
+    episodes: list[str | int],
+    flags: list[str] | tuple = (),
+    jobs: int | str = 1,
+    arc: str | None = None,
+    retries: int = 2,
+    retry_delay: float = 10,
+    config_dir: str | None = None,
+    on_result: Callable[[dict], None] | None = None,
+    events: bool = True,
+) -> list[dict]:
+    """
+    Mux the episodes of a project.
+
+    Args:
+        project (str): Name of the project in the config.
+        episodes (list[str | int]): Episodes to mux; numbers are padded to two digits like on the command line.
+        flags (list[str] | tuple): Custom flags for the gradle command (e.g. -Pkey=value).
+        jobs (int | str): Maximum episodes to mux at the same time, or 'auto'.
+        arc (str | None): Folder of the arc (e.g. '01 S1') for projects with alternate folder structure; None to use the episodes as they are.
+        retries (int): Times to mux an episode again when it fails because of a transient error.
+        retry_delay (float): Seconds to wait before the first retry. It doubles with every retry.
+        config_dir (str | None): Config folder of muxkt; None for the one the command line uses.
+        on_result (Callable[[dict], None] | None): Called with the result of every episode as soon as it is known.
+        events (bool): Get task events from gradle through an init script. It is never used when the configuration cache is on.
+
+    Returns:
+        list[dict]: Result of every episode in the order of the episodes with:
+            episode (str): Name of the episode in its mux task.
+            ok (bool): True if the mux succeeded.
+            returncode (int): Return code of gradle.
+            retries (int): Times the episode was muxed again.
+            retry_reasons (list[str]): Transient errors that caused the retries.
+            duration (float): Seconds the last mux took.
+            usage (dict): Resources used by the last mux (see ResourceUsage.result).
+            log (str): Path of the archived output of gradle.
+            tasks (list[dict]): Task, outcome and duration in seconds (None if unknown) of every task.
+            outputs (list[str]): Absolute paths of the muxed files.
+            warnings (dict[str, list[str]]): Warnings keyed by what they are for.
+            failures (list[str]): Reasons why the mux failed; empty if it succeeded.
+
+    Raises:
+        ProjectNotFoundError: If the project is not in the config or its path does not exist.
+        DependencyError: If java or mkvmerge is not installed.
+        TaskNotFoundError: If the mux task of some episodes does not exist.
+    """
+
+    config, files = load_config(config_dir)
+
+    if not config.has_option("Project", project):
+        raise ProjectNotFoundError(f"Project '{project}' is not in the config.")
+    path = config.get("Project", project)
+    if not os.path.isdir(path):
+        raise ProjectNotFoundError(f"The path '{path}' does not exist.")
+
+    missing = [dep for dep in ["java", "mkvmerge"] if which(dep) is None]
+    if missing:
+        raise DependencyError(f"Not installed: {', '.join(missing)}")
+
+    names = [f"{ep:02}" if isinstance(ep, int) else str(ep) for ep in episodes]
+    if arc:
+        names = [f"{arc_name(config, project, arc)}_{ep}" for ep in names]
+
+    invalid = find_missing_tasks(
+        path, names, files["tasks_cache"], files["properties_cache"]
+    )
+    if invalid:
+        raise TaskNotFoundError(project, invalid)
+
+    init_script = None
+    if events and not configuration_cache_enabled(path, flags):
+        init_script = write_init_script(files["config_file_path"])
+    durations = Durations(files["durations_file"])
+    results = []
+
+    # Logs of the batch are kept apart so that several batches and the
+    # command line can run at the same time.
+    with tempfile.TemporaryDirectory(prefix="muxkt-") as log_dir:
+        output_file = os.path.join(log_dir, "output.txt")
+        commands = [
+            (
+                ep,
+                build_command(flags, ep, init_script, episode_events(output_file, ep)),
+                episode_log(output_file, ep),
+            )
+            for ep in names
+        ]
+
+        retry_reasons = {}
+
+        def should_retry(ep: str, returncode: int, attempt: int) -> float | None:
+            if attempt > retries:
+                return None
+            reasons = find_transient_failures(episode_log(output_file, ep))
+            if not reasons:
+                return None
+            retry_reasons.setdefault(ep, []).append(reasons[0])
+            return retry_delay * 2 ** (attempt - 1)
+
+        runs = run_commands(
+            commands,
+            Scheduler(resolve_jobs(str(jobs))),
+            retry_delay=should_retry,
+            cwd=path,
+        )
+        for run in runs:
+            ep = run["name"]
+            log = episode_log(output_file, ep)
+            task_events = read_events(episode_events(output_file, ep))
+
+            result = {
+                "episode": ep,
+                "ok": run["returncode"] == 0,
+                "returncode": run["returncode"],
+                "retries": run["retries"],
+                "retry_reasons": retry_reasons.get(ep, []),
+                "duration": run["duration"],
+                "usage": run["usage"],
+                "log": archive_log(files["log_dir"], project, ep, log),
+                "tasks": [],
+                "outputs": [],
+                "warnings": {
+                    group[0]: group[1:] for group in parse_warnings(log) if group
+                },
+                "failures": [],
+            }
+
+            if result["ok"]:
+                durations.record(project, ep, run["duration"])
+                durations.save()
+                sections, tasks = parse_success(log, task_events)
+                result["tasks"] = tasks_of(sections, tasks)
+                result["outputs"] = [
+                    os.path.join(path, output)
+                    for header, matches in sections
+                    if header == "OUTPUT:"
+                    for output in matches
+                ]
+            else:
+                failures, compilation_errors = parse_failures(log, task_events)
+                result["failures"] = failures + compilation_errors
+
+            results.append(result)
+            if on_result:
+                on_result(result)
+
+    return results
+
+
+def tasks_of(sections: list[tuple[str, list]], tasks: list[dict]) -> list[dict]:
+    """
+    Get the tasks of a successful mux from the task events or from its output.
+
+    Args:
+        sections (list[tuple[str, list]]): Sections returned by parse_success.
+        tasks (list[dict]): Task events returned by parse_success.
+
+    Returns:
+        list[dict]: Task, outcome and duration in seconds (None if unknown) of every task.
+    """
+
+    if tasks:
+        return [
+            {
+                "task": task["task"].removeprefix(":"),
+                "outcome": task["outcome"],
+                "duration": task["duration"] / 1000,
+            }
+            for task in tasks
+        ]
+
+    result = []
+    for header, matches in sections:
+        if header != "TASKS PERFORMED:":
+            continue
+        for match in matches:
+            task = re.match(r"(\S+)( UP-TO-DATE)?", match)
+            if task:
+                result.append(
+                    {
+                        "task": task.group(1),
+                        "outcome": (task.group(2) or "EXECUTED").strip(),
+                        "duration": None,
+                    }
+                )
+    return result
@@ -0,0 +1,75 @@
+import configparser
+import os
+
+import click
+from click.shell_completion import CompletionItem
+
+from .properties import get_mux_entries
+from .tasks import get_cached_tasks
+
+# Completion runs without the entry point so it reads the config itself. It
+# must answer from files only and never start gradle.
+
+
+def completion_config() -> tuple[configparser.ConfigParser, str]:
+    """
+    Read the config for shell completion.
+
+    Returns:
+        configparser.ConfigParser: The configuration object.
+        str: Path of the folder where config and caches are stored.
+    """
+
+    config_file_path = click.get_app_dir("muxkt")
+    config = configparser.ConfigParser()
+    config.read(os.path.join(config_file_path, "config"))
+    return config, config_file_path
+
+
+def complete_project(
+    ctx: click.Context, param: click.Parameter, incomplete: str
+) -> list[CompletionItem]:
+    """Complete names of the projects in the config."""
+
+    config, _ = completion_config()
+    if not config.has_section("Project"):
+        return []
+
+    return [
+        CompletionItem(name, help=path)
+        for name, path in config.items("Project")
+        if name.startswith(incomplete)
+    ]
+
+
+def complete_episode(
+    ctx: click.Context, param: click.Parameter, incomplete: str
+) -> list[CompletionItem]:
+    """Complete episodes of the project from its cached mux tasks or its sub.properties."""
+
+    config, config_file_path = completion_config()
+    project = ctx.params.get("project")
+    if not project or not config.has_option("Project", project):
+        return []
+
+    path = config.get("Project", project)
+    tasks = get_cached_tasks(path, os.path.join(config_file_path, "tasks_cache.json"))
+    if tasks is not None:
+        entries = [task.removeprefix("mux.") for task in tasks]
+    else:
+        entries = get_mux_entries(
+            path, os.path.join(config_file_path, "properties_cache.json")
+        )
+
+    if config.get("Folder Structure", project, fallback="normal") == "alternate":
+        # Arc is chosen separately so only the episode part is completed.
+        entries = [entry.rpartition("_")[2] for entry in entries or []]
+
+    chosen = ctx.params.get("episode") or ()
+    episodes = sorted({entry for entry in entries or [] if entry.isdigit()}, key=int)
+
+    return [
+        CompletionItem(ep)
+        for ep in episodes
+        if ep.startswith(incomplete) and int(ep) not in chosen
+    ]
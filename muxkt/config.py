@@ -1,15 +1,24 @@
 import configparser
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 
 import click
 from rich.console import Console
 from rich.table import Table
 from rich.tree import Tree
 
+from .completion import complete_project
 from .selection import fzf
+from .tasks import update_task_cache
 from .utils import exit_with_msg, path_is_valid_subkt
 
 console = Console()
 
+# Folders that never contain SubKt projects and can be huge.
+SKIPPED_FOLDERS = {"build", "node_modules", "__pycache__"}
+
 
 @click.group()
 @click.help_option("--help", "-h")
@@ -97,6 +106,118 @@ def add(ctx: click.Context) -> None:
     save_config(config, ctx.obj["config_file"])
 
 
+@config.command()
+@click.pass_context
+@click.argument("root", type=click.Path(exists=True, file_okay=False))
+@click.option(
+    "-d",
+    "--max-depth",
+    type=click.IntRange(min=0),
+    default=5,
+    show_default=True,
+    help="How many folders deep to look for projects.",
+)
+@click.option(
+    "-y",
+    "--yes",
+    is_flag=True,
+    help="Add the projects without asking for confirmation.",
+)
+def discover(ctx: click.Context, root: str, max_depth: int, yes: bool) -> None:
+    """
+    Find SubKt projects under a folder and add them to config.
+
+    Args:
+        ctx (click.Context): Context passed by click from the entry point.
+        root (str): Folder under which to look for projects.
+        max_depth (int): How many folders deep to look for projects.
+        yes (bool): Add the projects without asking for confirmation.
+
+    Returns:
+        None
+    """
+
+    config = ctx.obj["config"]
+
+    with console.status(f"[cyan]Looking for projects in '{root}'[/cyan]"):
+        projects = discover_projects(root, max_depth, ctx.obj["discover_cache"])
+
+    existing_paths = {
+        os.path.abspath(path)
+        for path in (
+            config["Project"].values() if config.has_section("Project") else []
+        )
+    }
+
+    new_projects = {}
+    for path, folder_structure in projects.items():
+        if path in existing_paths:
+            continue
+        name = re.sub(r"\s+", "_", os.path.basename(path)).lower()
+        if config.has_option("Project", name) or name in new_projects:
+            console.print(
+                f"[red]Error:[/red] Project '{name}' already exists. Skipping '{path}'."
+            )
+            continue
+        new_projects[name] = (path, folder_structure)
+
+    if not new_projects:
+        console.print("[cyan]No new projects found.[/cyan]")
+        return
+
+    table = Table(row_styles=["dim", "none"])
+    table.add_column("Name")
+    table.add_column("Path")
+    table.add_column("Folder Structure")
+    for name, (path, folder_structure) in sorted(new_projects.items()):
+        table.add_row(name, path, folder_structure)
+    console.print(table)
+
+    if not yes and not click.confirm(
+        f"Add {len(new_projects)} projects to the config?", default=True
+    ):
+        return
+
+    for name, (path, folder_structure) in new_projects.items():
+        config = add_to_configparser(config, "Project", {name: path})
+        config = add_to_configparser(
+            config, "Folder Structure", {name: folder_structure}
+        )
+        if folder_structure == "alternate":
+            config = add_to_configparser(config, f"{name}_exceptions", {})
+
+    save_config(config, ctx.obj["config_file"])
+
+
+@config.command()
+@click.pass_context
+@click.argument("project", required=False, shell_complete=complete_project)
+def tasks(ctx: click.Context, project: str | None) -> None:
+    """
+    Refresh the cached list of mux tasks of a project using gradle.
+    The cache is used for shell completion and for checking episodes before muxing.
+
+    Args:
+        ctx (click.Context): Context passed by click from the entry point.
+        project (str | None): Name of the project; None to select it interactively.
+
+    Returns:
+        None
+    """
+
+    project_name, path = read_config(ctx.obj["config"], project)
+
+    with console.status(f'[cyan]Listing tasks of "{project_name}"[/cyan]'):
+        try:
+            task_list = update_task_cache(path, ctx.obj["tasks_cache"])
+        except (OSError, RuntimeError) as e:
+            exit_with_msg(f"Could not list the tasks of '{project_name}': {e}")
+
+    console.print(
+        f'[cyan]Cached {len(task_list)} mux tasks of "{project_name}".[/cyan]'
+    )
+
+
 @config.command()
 @click.pass_context
 def remove(ctx: click.Context) -> None:
@@ -392,6 +513,127 @@ def save_config(
         config.write(c)
 
 
+def scan_directory(path: str, cache: dict) -> dict:
+    """
+    List the folders inside a folder unless it has not changed since it was cached.
+
+    Args:
+        path (str): Folder to scan.
+        cache (dict): Previous scans keyed by path of the folder.
+
+    Returns:
+        dict: Modified time of the folder, its sub folders and whether it has SubKt files.
+    """
+
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return {"mtime_ns": 0, "folders": [], "subkt": False}
+
+    # Adding or removing an entry changes the modified time of the folder.
+    cached = cache.get(path)
+    if cached and cached["mtime_ns"] == mtime:
+        return cached
+
+    folders = []
+    subkt = False
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.name == "build.gradle.kts" and entry.is_file():
+                    subkt = True
+                elif entry.is_dir(follow_symlinks=False) and not (
+                    entry.name.startswith(".") or entry.name in SKIPPED_FOLDERS
+                ):
+                    folders.append(entry.name)
+    except OSError:
+        pass
+
+    return {"mtime_ns": mtime, "folders": sorted(folders), "subkt": subkt}
+
+
+def detect_folder_structure(path: str, folders: list[str], cache: dict) -> str:
+    """
+    Guess the folder structure of a project from the folders inside it.
+
+    Args:
+        path (str): Path of the project.
+        folders (list[str]): Folders inside the project.
+        cache (dict): Previous scans keyed by path of the folder.
+
+    Returns:
+        str: 'alternate' if the arc folders contain episode folders; otherwise 'normal'.
+    """
+
+    for folder in folders:
+        # Arc folders are named like '01 Name of Arc' while episode folders are just numbers.
+        if not re.match(r"\d+ ", folder):
+            continue
+        arc = scan_directory(os.path.join(path, folder), cache)
+        cache[os.path.join(path, folder)] = arc
+        if any(sub[0].isdigit() for sub in arc["folders"]):
+            return "alternate"
+
+    return "normal"
+
+
+def discover_projects(root: str, max_depth: int, cache_file: str) -> dict[str, str]:
+    """
+    Find the SubKt projects under a folder by scanning every level of folders in parallel.
+
+    Args:
+        root (str): Folder under which to look for projects.
+        max_depth (int): How many folders deep to look for projects.
+        cache_file (str): Path of the file where the scanned folders are cached.
+
+    Returns:
+        dict[str, str]: Folder structure of the projects found keyed by their path.
+    """
+
+    try:
+        with open(cache_file, "r") as f:
+            cache = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        cache = {}
+
+    projects = {}
+    level = [os.path.abspath(root)]
+
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        for depth in range(max_depth + 1):
+            if not level:
+                break
+
+            scans = list(executor.map(lambda path: scan_directory(path, cache), level))
+
+            next_level = []
+            for path, scan in zip(level, scans):
+                cache[path] = scan
+                if scan["subkt"]:
+                    projects[path] = scan["folders"]
+                    # Projects do not contain other projects.
+                    continue
+                next_level.extend(
+                    os.path.join(path, folder) for folder in scan["folders"]
+                )
+            level = next_level
+
+        projects = dict(
+            zip(
+                projects,
+                executor.map(
+                    lambda item: detect_folder_structure(*item, cache),
+                    projects.items(),
+                ),
+            )
+        )
+
+    with open(cache_file, "w") as f:
+        json.dump(cache, f)
+
+    return projects
+
+
 def give_folder_structure_info() -> None:
     """
     Prints the information about folder structures
@@ -0,0 +1,412 @@
+import codecs
+import ipaddress
+import json
+import os
+import queue
+import socket
+import socketserver
+import subprocess
+import threading
+import time
+from typing import Callable, Iterator
+
+import click
+from rich.console import Console
+
+from .tasks import build_command
+from .timings import timings
+from .utils import check_dependencies, exit_with_msg
+
+console = Console()
+
+DEFAULT_ADDRESS = "127.0.0.1:7878"
+
+# Size of the chunks of log that a worker sends at a time.
+LOG_CHUNK_SIZE = 64 * 1024
+
+
+@click.command()
+@click.pass_context
+@click.help_option("--help", "-h")
+@click.option(
+    "-l",
+    "--listen",
+    type=str,
+    default=DEFAULT_ADDRESS,
+    show_default=True,
+    help="Address to listen on; 'host:port' or 'unix:/path/to/socket'.",
+)
+@click.option(
+    "-t",
+    "--token",
+    type=str,
+    envvar="MUXKT_WORKER_TOKEN",
+    help="Token that the coordinator has to send before it can mux. Required unless listening on localhost or a unix socket.",
+)
+@click.option(
+    "--allow-flags",
+    is_flag=True,
+    help="Pass every custom flag of the coordinator to gradle. Only -P flags are passed otherwise.",
+)
+def worker(
+    ctx: click.Context, listen: str, token: str | None, allow_flags: bool
+) -> None:
+    """Mux episodes sent by 'muxkt mux --worker' running on another host."""
+    """
+    Args:
+        ctx (click.Context): Context passed by click from the entry point.
+
+    Options:
+        listen (str): Address to listen on.
+        token (str | None): Token that the coordinator has to send; None to accept any coordinator.
+        allow_flags (bool): Pass any custom flag to gradle. True if user used --allow-flags; otherwise False
+
+    Returns:
+        None
+    """
+
+    check_dependencies()
+
+    config = ctx.obj["config"]
+    projects = {
+        name: path
+        for name, path in (
+            config.items("Project") if config.has_section("Project") else []
+        )
+        if os.path.isfile(os.path.join(path, "build.gradle.kts"))
+    }
+    if not projects:
+        exit_with_msg("None of the projects in the config can be reached here.")
+
+    family, address = parse_address(listen)
+    # Anyone who can reach the worker can run gradle on it.
+    if not token and not is_local_address(family, address):
+        exit_with_msg(
+            f"A token is required to listen on '{listen}'. "
+            "Use --token or set MUXKT_WORKER_TOKEN."
+        )
+
+    if family == socket.AF_UNIX and os.path.exists(address):
+        os.remove(address)
+
+    server_class = (
+        socketserver.ThreadingUnixStreamServer
+        if family == socket.AF_UNIX
+        else socketserver.ThreadingTCPServer
+    )
+    server_class.allow_reuse_address = True
+    server_class.daemon_threads = True
+
+    with server_class(address, WorkerHandler) as server:
+        server.projects = projects
+        server.token = token
+        server.allow_flags = allow_flags
+        console.print(
+            f"[cyan]Worker listening on {listen} for projects: "
+            f"{', '.join(sorted(projects))}[/cyan]"
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+class WorkerHandler(socketserver.StreamRequestHandler):
+    """
+    Handles a connection from a coordinator. Every message is a line of JSON.
+    The coordinator sends 'hello' once and then 'job' for every episode.
+    """
+
+    def send(self, message: dict) -> None:
+        self.wfile.write(json.dumps(message).encode() + b"\n")
+        self.wfile.flush()
+
+    def handle(self) -> None:
+        greeted = False
+        for line in self.rfile:
+            message = json.loads(line)
+
+            if message["type"] == "hello":
+                if self.server.token and message.get("token") != self.server.token:
+                    self.send({"type": "error", "message": "Invalid token."})
+                    return
+                greeted = True
+                self.send({"type": "hello", "projects": sorted(self.server.projects)})
+
+            elif message["type"] == "job" and greeted:
+                self.run_job(message)
+
+    def run_job(self, job: dict) -> None:
+        path = self.server.projects.get(job["project"])
+        if path is None:
+            self.send({"type": "done", "returncode": -1})
+            return
+
+        # Other flags, like --init-script, can run any code in the build.
+        rejected = [
+            flag
+            for flag in job["custom_flag"]
+            if not (self.server.allow_flags or flag.startswith("-P"))
+        ]
+        if rejected:
+            message = (
+                f"Error: Flags not allowed by the worker: {' '.join(rejected)}\n"
+                "Only -P flags are allowed unless the worker uses --allow-flags.\n"
+            )
+            self.send({"type": "log", "data": message})
+            self.send({"type": "done", "returncode": -1})
+            return
+
+        command = build_command(job["custom_flag"], job["episode"])
+        console.print(
+            f'[cyan]Muxing "{job["project"]}" - Episode {job["episode"]}[/cyan]'
+        )
+        try:
+            proc = subprocess.Popen(
+                command, cwd=path, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+            )
+        except OSError as e:
+            self.send({"type": "log", "data": f"Error: {e}\n"})
+            self.send({"type": "done", "returncode": -1})
+            return
+
+        # A chunk can end in the middle of a multibyte character.
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        while chunk := proc.stdout.read1(LOG_CHUNK_SIZE):
+            self.send({"type": "log", "data": decoder.decode(chunk)})
+
+        self.send({"type": "done", "returncode": proc.wait()})
+
+
+def parse_address(address: str) -> tuple[int, str | tuple[str, int]]:
+    """
+    Parse the address of a worker.
+
+    Args:
+        address (str): 'host:port' or 'unix:/path/to/socket'.
+
+    Returns:
+        int: Socket family of the address.
+        str | tuple[str, int]: Address that can be given to socket.
+    """
+
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address.removeprefix("unix:")
+
+    host, _, port = address.rpartition(":")
+    if not host or not port.isdigit():
+        raise click.BadParameter(f"'{address}' is not 'host:port' or 'unix:/path'.")
+    return socket.AF_INET, (host, int(port))
+
+
+def is_local_address(family: int, address: str | tuple[str, int]) -> bool:
+    """
+    Check if only this computer can connect to an address.
+
+    Args:
+        family (int): Socket family of the address.
+        address (str | tuple[str, int]): Address returned by parse_address.
+
+    Returns:
+        bool: True for unix sockets and loopback addresses; otherwise False.
+    """
+
+    if family == socket.AF_UNIX:
+        return True
+
+    host = address[0]
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host.strip("[]")).is_loopback
+    except ValueError:
+        return False
+
+
+class WorkerConnection:
+    """
+    Connection from the coordinator to a worker.
+    """
+
+    def __init__(self, address: str, token: str | None) -> None:
+        family, sock_address = parse_address(address)
+        self.address = address
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        self.sock.connect(sock_address)
+        self.file = self.sock.makefile("rwb")
+
+        self.send({"type": "hello", "token": token})
+        reply = self.receive()
+        if reply["type"] != "hello":
+            raise ConnectionError(reply.get("message", "Unexpected reply."))
+        self.projects = reply["projects"]
+
+    def send(self, message: dict) -> None:
+        self.file.write(json.dumps(message).encode() + b"\n")
+        self.file.flush()
+
+    def receive(self) -> dict:
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("Worker closed the connection.")
+        return json.loads(line)
+
+    def mux(self, project: str, ep: str, custom_flag: list, output_file: str) -> int:
+        """
+        Mux an episode on the worker and write its output to the output file.
+
+        Returns:
+            int: Return code of the mux.
+        """
+
+        self.send(
+            {
+                "type": "job",
+                "project": project,
+                "episode": ep,
+                "custom_flag": list(custom_flag),
+            }
+        )
+        with open(output_file, "w") as f:
+            while True:
+                message = self.receive()
+                if message["type"] == "log":
+                    f.write(message["data"])
+                elif message["type"] == "done":
+                    return message["returncode"]
+
+    def close(self) -> None:
+        self.file.close()
+        self.sock.close()
+
+
+def run_remote(
+    workers: list[str],
+    token: str | None,
+    project_name: str,
+    custom_flag: list,
+    episodes: list[tuple[str, str]],
+    on_change: Callable[[list[str]], None] | None = None,
+    retry_delay: Callable[[str, int, int], float | None] | None = None,
+) -> Iterator[dict]:
+    """
+    Mux the episodes on the workers that can reach the project, one episode per worker at a time.
+
+    Args:
+        workers (list[str]): Addresses of the workers.
+        token (str | None): Token to send to the workers.
+        project_name (str): Name of the project.
+        custom_flag (list): Custom flags for the muxing command.
+        episodes (list[tuple[str, str]]): Episode and the file to store its output.
+        on_change (Callable[[list[str]], None] | None): Called with the episodes being muxed whenever it changes.
+        retry_delay (Callable[[str, int, int], float | None] | None): Same as for run_commands.
+
+    Yields:
+        dict: Name, return code, number of retries, duration and worker of each episode in the same order as the episodes.
+
+    Raises:
+        ConnectionError: If no worker can reach the project.
+    """
+
+    connections = []
+    for address in workers:
+        try:
+            connection = WorkerConnection(address, token)
+        except (OSError, ConnectionError, ValueError) as e:
+            console.print(f"[yellow]Could not use worker {address}: {e}[/yellow]")
+            continue
+        if project_name in connection.projects:
+            connections.append(connection)
+        else:
+            connection.close()
+
+    if not connections:
+        raise ConnectionError(f"No worker can reach the project '{project_name}'.")
+
+    output_files = dict(episodes)
+    jobs = queue.Queue()
+    for ep in output_files:
+        jobs.put(ep)
+
+    lock = threading.Lock()
+    running = []
+    attempts = dict.fromkeys(output_files, 0)
+    finished = {}
+    done = threading.Event()
+
+    def changed() -> None:
+        if on_change:
+            on_change(list(running))
+
+    def work(connection: WorkerConnection) -> None:
+        while not done.is_set():
+            try:
+                ep = jobs.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            with lock:
+                running.append(ep)
+                attempts[ep] += 1
+                changed()
+
+            start = time.perf_counter()
+            try:
+                returncode = connection.mux(
+                    project_name, ep, custom_flag, output_files[ep]
+                )
+            except (OSError, ConnectionError, ValueError):
+                # Give the episode to another worker.
+                with lock:
+                    running.remove(ep)
+                    attempts[ep] -= 1
+                    changed()
+                jobs.put(ep)
+                return
+            end = time.perf_counter()
+            timings.record("gradle", start, end, episode=ep)
+
+            delay = None
+            if returncode != 0 and retry_delay:
+                delay = retry_delay(ep, returncode, attempts[ep])
+
+            with lock:
+                running.remove(ep)
+                if delay is None:
+                    finished[ep] = {
+                        "name": ep,
+                        "returncode": returncode,
+                        "retries": attempts[ep] - 1,
+                        "duration": end - start,
+                        "worker": connection.address,
+                    }
+                changed()
+
+            if delay is not None:
+                threading.Timer(delay, jobs.put, (ep,)).start()
+
+    threads = [
+        threading.Thread(target=work, args=(connection,), daemon=True)
+        for connection in connections
+    ]
+    for thread in threads:
+        thread.start()
+
+    order = list(output_files)
+    try:
+        while order:
+            with lock:
+                ready = order[0] in finished
+            if ready:
+                with lock:
+                    result = finished.pop(order.pop(0))
+                yield result
+                continue
+
+            if not any(thread.is_alive() for thread in threads):
+                raise ConnectionError("Lost connection to all the workers.")
+            time.sleep(0.2)
+    finally:
+        done.set()
+        for connection in connections:
+            connection.close()
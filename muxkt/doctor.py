@@ -0,0 +1,366 @@
+import os
+import re
+import shutil
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import click
+from rich.console import Console
+from rich.table import Table
+from rich.text import Text
+
+from .completion import complete_project
+from .properties import gradle_settings
+from .scheduler import process_tree_rss
+from .utils import exit_with_msg, format_size
+
+console = Console()
+
+# Settings of gradle.properties that change how fast gradle runs.
+GRADLE_SETTINGS = [
+    "org.gradle.daemon",
+    "org.gradle.parallel",
+    "org.gradle.caching",
+    "org.gradle.configuration-cache",
+    "org.gradle.jvmargs",
+]
+
+# Heap of the gradle daemon when org.gradle.jvmargs does not set -Xmx.
+DEFAULT_DAEMON_HEAP = "512m"
+
+# A JVM that takes longer than this to start makes every mux noticeably slower.
+SLOW_JVM_START = 1.0
+
+CHUNK_SIZE = 1024 * 1024
+
+
+@click.command()
+@click.pass_context
+@click.help_option("--help", "-h")
+@click.argument(
+    "projects", required=False, nargs=-1, type=str, shell_complete=complete_project
+)
+@click.option(
+    "-s",
+    "--size",
+    type=click.IntRange(min=0),
+    default=64,
+    show_default=True,
+    help="MiB to write and read in each project to measure its disk; 0 to skip.",
+)
+def doctor(ctx: click.Context, projects: tuple, size: int) -> None:
+    """Measure the environment muxing runs in. Defaults to all projects."""
+    """
+    Args:
+        ctx (click.Context): Context passed by click from the entry point.
+        projects (tuple): Names of the projects to check; empty to check all of them.
+
+    Options:
+        size (int): MiB to write and read in each project path; 0 to not measure the disk.
+
+    Returns:
+        None
+    """
+
+    config = ctx.obj["config"]
+    configured = dict(config.items("Project")) if config.has_section("Project") else {}
+
+    unknown = [name for name in projects if name not in configured]
+    if unknown:
+        exit_with_msg(f"Projects not found in the config: {', '.join(unknown)}")
+
+    names = projects or list(configured)
+    # Alternate projects share the path of their main project.
+    paths = {}
+    for name in names:
+        paths.setdefault(configured[name], name)
+
+    show_tools()
+
+    if not paths:
+        console.print("[cyan]No projects in the config to check.[/cyan]")
+        return
+
+    with console.status("[cyan]Asking gradle about its daemons...[/cyan]"):
+        with ThreadPoolExecutor() as executor:
+            statuses = dict(zip(paths, executor.map(gradle_daemons, paths)))
+    show_daemons(paths, statuses)
+
+    show_gradle_settings(paths)
+
+    with console.status("[cyan]Measuring the disks...[/cyan]"):
+        disks = {path: measure_disk(path, size * CHUNK_SIZE) for path in paths}
+    show_disks(paths, disks)
+
+
+def run_version(command: list[str]) -> tuple[str | None, float | None]:
+    """
+    Run a command that prints its version and time it.
+
+    Args:
+        command (list[str]): The command to run.
+
+    Returns:
+        str | None: First line of the output; None if the command could not be run.
+        float | None: Seconds the command took; None if it could not be run.
+    """
+
+    start = time.perf_counter()
+    try:
+        result = subprocess.run(command, capture_output=True, text=True)
+    except OSError:
+        return None, None
+    elapsed = time.perf_counter() - start
+
+    # java prints its version to stderr.
+    output = (result.stdout or result.stderr).strip()
+    return output.splitlines()[0] if output else "", elapsed
+
+
+def show_tools() -> None:
+    """
+    Print the versions of java and mkvmerge and how long the JVM takes to start.
+
+    Returns:
+        None
+    """
+
+    console.rule(Text("TOOLS:", style="bold green"))
+    table = Table(row_styles=["dim", "none"])
+    table.add_column("Tool")
+    table.add_column("Version")
+    table.add_column("Start time", justify="right")
+
+    for tool, command in [
+        ("java", ["java", "-version"]),
+        ("mkvmerge", ["mkvmerge", "--version"]),
+    ]:
+        version, elapsed = run_version(command)
+        if version is None:
+            table.add_row(tool, "[red]not found[/red]", "")
+            continue
+
+        start_time = f"{elapsed:.2f}s"
+        if tool == "java" and elapsed > SLOW_JVM_START:
+            start_time = f"[yellow]{start_time}[/yellow]"
+        table.add_row(tool, version, start_time)
+
+    console.print(table)
+
+
+def gradle_daemons(path: str) -> list[dict] | str:
+    """
+    Ask gradle which of its daemons are running for a project.
+
+    Args:
+        path (str): Path of the project.
+
+    Returns:
+        list[dict] | str: Pid, status, gradle version and RSS of each daemon; the error if gradle could not be asked.
+    """
+
+    cmdfile = "./gradlew" if os.name == "posix" else "gradlew.bat"
+    try:
+        result = subprocess.run(
+            [cmdfile, "--console=plain", "--status"],
+            cwd=path,
+            capture_output=True,
+            text=True,
+        )
+    except OSError as e:
+        return str(e)
+    if result.returncode != 0:
+        output = (result.stderr or result.stdout).strip()
+        return output.splitlines()[-1] if output else f"exit code {result.returncode}"
+
+    daemons = []
+    for match in re.finditer(r"^\s*(\d+)\s+(\w+)\s+(\S+)", result.stdout, re.MULTILINE):
+        pid = int(match.group(1))
+        daemons.append(
+            {
+                "pid": pid,
+                "status": match.group(2),
+                "version": match.group(3),
+                "rss": process_tree_rss(pid),
+            }
+        )
+    return daemons
+
+
+def daemon_heap(settings: dict[str, tuple[str, str]]) -> str:
+    """
+    Get the maximum heap of the gradle daemon from the settings.
+
+    Args:
+        settings (dict[str, tuple[str, str]]): Settings returned by gradle_settings.
+
+    Returns:
+        str: The -Xmx value, or the default of gradle followed by '(default)'.
+    """
+
+    jvmargs, _ = settings.get("org.gradle.jvmargs", ("", ""))
+    match = re.search(r"-Xmx(\S+)", jvmargs)
+    return match.group(1) if match else f"{DEFAULT_DAEMON_HEAP} (default)"
+
+
+def show_daemons(paths: dict[str, str], statuses: dict[str, list[dict] | str]) -> None:
+    """
+    Print the gradle daemons of every project and their heap.
+
+    Args:
+        paths (dict[str, str]): Name of the project keyed by its path.
+        statuses (dict[str, list[dict] | str]): Result of gradle_daemons keyed by path of the project.
+
+    Returns:
+        None
+    """
+
+    console.rule(Text("GRADLE DAEMONS:", style="bold green"))
+    table = Table(row_styles=["dim", "none"])
+    table.add_column("Project")
+    table.add_column("Daemons")
+    table.add_column("Max heap", justify="right")
+    table.add_column("RSS", justify="right")
+
+    for path, name in paths.items():
+        heap = daemon_heap(gradle_settings(path, GRADLE_SETTINGS))
+        status = statuses[path]
+
+        if isinstance(status, str):
+            table.add_row(name, f"[red]{status}[/red]", heap, "")
+        elif not status:
+            table.add_row(name, "[yellow]none running[/yellow]", heap, "")
+        else:
+            table.add_row(
+                name,
+                "\n".join(
+                    f"{daemon['pid']} {daemon['status']} ({daemon['version']})"
+                    for daemon in status
+                ),
+                heap,
+                "\n".join(
+                    format_size(daemon["rss"]) if daemon["rss"] else ""
+                    for daemon in status
+                ),
+            )
+
+    console.print(table)
+
+
+def show_gradle_settings(paths: dict[str, str]) -> None:
+    """
+    Print whether gradle.properties turns on the daemon, parallel builds and caching.
+
+    Args:
+        paths (dict[str, str]): Name of the project keyed by its path.
+
+    Returns:
+        None
+    """
+
+    console.rule(Text("GRADLE SETTINGS:", style="bold green"))
+    table = Table(row_styles=["dim", "none"])
+    table.add_column("Project")
+    for key in GRADLE_SETTINGS[:-1]:
+        table.add_column(key.removeprefix("org.gradle."))
+
+    for path, name in paths.items():
+        settings = gradle_settings(path, GRADLE_SETTINGS)
+        row = [name]
+        for key in GRADLE_SETTINGS[:-1]:
+            value, _ = settings.get(key, ("not set", ""))
+            if value == "false":
+                value = f"[yellow]{value}[/yellow]"
+            elif value == "not set":
+                value = f"[dim]{value}[/dim]"
+            row.append(value)
+        table.add_row(*row)
+
+    console.print(table)
+
+
+def measure_disk(path: str, size: int) -> dict:
+    """
+    Measure how fast a file can be written to and read from a folder and how
+    much space is free there. The file is synced to the disk and dropped from
+    the page cache before reading so that the disk is measured, not memory.
+
+    Args:
+        path (str): The folder.
+        size (int): Bytes to write and read; 0 to only get the free space.
+
+    Returns:
+        dict: free, write and read in bytes and bytes per second; write and read are None if not measured. error if something failed.
+    """
+
+    result = {"free": None, "write": None, "read": None, "error": None}
+    try:
+        result["free"] = shutil.disk_usage(path).free
+    except OSError as e:
+        result["error"] = str(e)
+        return result
+
+    if not size:
+        return result
+
+    test_file = os.path.join(path, f".muxkt-doctor-{os.getpid()}.tmp")
+    # Random data so that compressing filesystems do not make the disk look faster.
+    chunk = os.urandom(CHUNK_SIZE)
+    try:
+        start = time.perf_counter()
+        with open(test_file, "wb", buffering=0) as f:
+            for _ in range(size // CHUNK_SIZE):
+                f.write(chunk)
+            os.fsync(f.fileno())
+        result["write"] = size / (time.perf_counter() - start)
+
+        with open(test_file, "rb", buffering=0) as f:
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+            buffer = bytearray(CHUNK_SIZE)
+            start = time.perf_counter()
+            while f.readinto(buffer):
+                pass
+            result["read"] = size / (time.perf_counter() - start)
+    except OSError as e:
+        result["error"] = str(e)
+    finally:
+        if os.path.exists(test_file):
+            os.remove(test_file)
+
+    return result
+
+
+def show_disks(paths: dict[str, str], disks: dict[str, dict]) -> None:
+    """
+    Print the free space and the throughput of the disk of every project.
+
+    Args:
+        paths (dict[str, str]): Name of the project keyed by its path.
+        disks (dict[str, dict]): Result of measure_disk keyed by path of the project.
+
+    Returns:
+        None
+    """
+
+    console.rule(Text("DISKS:", style="bold green"))
+    table = Table(row_styles=["dim", "none"])
+    table.add_column("Project")
+    table.add_column("Path")
+    table.add_column("Free", justify="right")
+    table.add_column("Write", justify="right")
+    table.add_column("Read", justify="right")
+
+    for path, name in paths.items():
+        disk = disks[path]
+        row = [name, path]
+        row.append(format_size(disk["free"]) if disk["free"] is not None else "")
+        for key in ["write", "read"]:
+            row.append(f"{format_size(disk[key])}/s" if disk[key] is not None else "")
+        if disk["error"]:
+            row[-1] = f"[red]{disk['error']}[/red]"
+        table.add_row(*row)
+
+    console.print(table)
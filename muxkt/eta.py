@@ -0,0 +1,143 @@
+import json
+import time
+
+from rich.text import Text
+
+# Weight of the newest duration in the moving average.
+SMOOTHING = 0.3
+
+
+class Durations:
+    """
+    Moving averages of how long the mux of each episode of each project took.
+    """
+
+    def __init__(self, durations_file: str) -> None:
+        self.durations_file = durations_file
+        try:
+            with open(durations_file, "r") as f:
+                self.durations = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.durations = {}
+
+    def estimate(self, project: str, ep: str) -> float | None:
+        """
+        Estimate how long the mux of an episode will take.
+
+        Args:
+            project (str): Name of the project.
+            ep (str): Episode to mux.
+
+        Returns:
+            float | None: Seconds the mux is expected to take; None if the project was never muxed.
+        """
+
+        durations = self.durations.get(project, {})
+        # Episodes that were never muxed are expected to take as long as the others.
+        entry = durations.get(ep) or durations.get("*")
+        return entry["mean"] if entry else None
+
+    def record(self, project: str, ep: str, duration: float) -> None:
+        """
+        Add the duration of a mux to the moving averages of the episode and the project.
+
+        Args:
+            project (str): Name of the project.
+            ep (str): Episode that was muxed.
+            duration (float): Seconds the mux took.
+
+        Returns:
+            None
+        """
+
+        durations = self.durations.setdefault(project, {})
+        for key in [ep, "*"]:
+            entry = durations.get(key)
+            if entry:
+                entry["mean"] += SMOOTHING * (duration - entry["mean"])
+                entry["count"] += 1
+            else:
+                durations[key] = {"mean": duration, "count": 1}
+
+    def save(self) -> None:
+        """Save the moving averages."""
+
+        with open(self.durations_file, "w") as f:
+            json.dump(self.durations, f)
+
+
+def format_duration(seconds: float | None) -> str:
+    """
+    Format seconds as h:mm:ss or m:ss.
+
+    Args:
+        seconds (float | None): Seconds to format; None if unknown.
+
+    Returns:
+        str: The formatted duration; '?' if unknown.
+    """
+
+    if seconds is None:
+        return "?"
+
+    minutes, seconds = divmod(round(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02}:{seconds:02}"
+    return f"{minutes}:{seconds:02}"
+
+
+class EtaStatus:
+    """
+    Text of the muxing spinner with elapsed time and ETA of the running
+    episodes and of the whole batch. It is rendered again on every refresh of
+    the spinner so the times keep counting.
+    """
+
+    def __init__(self, project: str, episodes: list[str], durations: Durations) -> None:
+        self.project = project
+        self.estimates = {ep: durations.estimate(project, ep) for ep in episodes}
+        self.remaining = list(episodes)
+        self.running = {}
+
+    def update(self, running: list[str]) -> None:
+        """Called with the names of running episodes whenever it changes."""
+
+        now = time.monotonic()
+        self.running = {ep: self.running.get(ep, now) for ep in running}
+
+    def finished(self, ep: str) -> None:
+        """Called when an episode is done."""
+
+        if ep in self.remaining:
+            self.remaining.remove(ep)
+
+    def batch_eta(self) -> float | None:
+        """Seconds until all the episodes are muxed; None if unknown."""
+
+        now = time.monotonic()
+        total = 0.0
+        for ep in self.remaining:
+            estimate = self.estimates[ep]
+            if estimate is None:
+                return None
+            if ep in self.running:
+                estimate = max(0.0, estimate - (now - self.running[ep]))
+            total += estimate
+
+        return total / max(1, len(self.running))
+
+    def __rich__(self) -> Text:
+        now = time.monotonic()
+        episodes = [
+            f"{ep} ({format_duration(now - start)} / ~{format_duration(self.estimates[ep])})"
+            for ep, start in self.running.items()
+        ]
+        text = Text(f'Muxing "{self.project}" - Episode {", ".join(episodes)}', "cyan")
+
+        if len(self.remaining) > 1:
+            text.append(
+                f" | {len(self.remaining)} left, ~{format_duration(self.batch_eta())}",
+                "dim",
+            )
+        return text
@@ -0,0 +1,172 @@
+import json
+import os
+import re
+
+from .properties import gradle_settings
+
+# Gradle init script that writes a JSON line to the file in the muxkt.events
+# property whenever a task starts or finishes and when the build finishes.
+# Gradle versions without these listeners run the build without events and
+# muxkt falls back to reading the console output. The configuration cache
+# fails the build because of these listeners, so the script is not passed
+# when it is on.
+INIT_SCRIPT = """\
+def eventsPath = gradle.startParameter.projectProperties["muxkt.events"]
+if (eventsPath != null) {
+    def events = new File(eventsPath)
+    events.text = ""
+
+    def write = { Map record ->
+        synchronized (events) {
+            events << groovy.json.JsonOutput.toJson(record) + "\\n"
+        }
+    }
+    def messages = { Throwable failure ->
+        def chain = []
+        while (failure != null) {
+            if (failure.message && !chain.contains(failure.message)) {
+                chain << failure.message
+            }
+            failure = failure.cause
+        }
+        chain
+    }
+    def starts = [:].asSynchronized()
+
+    try {
+        gradle.taskGraph.beforeTask { task ->
+            starts[task.path] = System.currentTimeMillis()
+            write([type: "start", task: task.path, time: starts[task.path]])
+        }
+        gradle.taskGraph.afterTask { task, state ->
+            def end = System.currentTimeMillis()
+            def outcome = "EXECUTED"
+            if (state.failure != null) {
+                outcome = "FAILED"
+            } else if (state.skipped) {
+                outcome = state.skipMessage ?: "SKIPPED"
+            }
+            def outputs = []
+            try {
+                outputs = task.outputs.files.files.collect { it.absolutePath }
+            } catch (Exception ignored) {
+            }
+            write([
+                type: "finish",
+                task: task.path,
+                outcome: outcome,
+                duration: end - (starts[task.path] ?: end),
+                outputs: outputs,
+                failure: messages(state.failure),
+            ])
+        }
+        gradle.buildFinished { result ->
+            write([
+                type: "build",
+                outcome: result.failure == null ? "SUCCESS" : "FAILED",
+                failure: messages(result.failure),
+            ])
+        }
+    } catch (Exception ignored) {
+    }
+}
+"""
+
+
+# Settings of gradle.properties that turn on the configuration cache.
+CONFIGURATION_CACHE_SETTINGS = [
+    "org.gradle.configuration-cache",
+    "org.gradle.unsafe.configuration-cache",
+]
+
+
+def configuration_cache_enabled(path: str, flags: list[str] | tuple) -> bool:
+    """
+    Check if gradle runs the mux with the configuration cache on.
+
+    Args:
+        path (str): Path of the project.
+        flags (list[str] | tuple): Custom flags for the gradle command.
+
+    Returns:
+        bool: True if the flags or gradle.properties turn the configuration cache on; otherwise False.
+    """
+
+    # The last flag wins and flags win over gradle.properties.
+    for flag in reversed(flags):
+        if flag == "--configuration-cache":
+            return True
+        if flag == "--no-configuration-cache":
+            return False
+        match = re.fullmatch(r"-D(\S+)=(.*)", flag)
+        if match and match.group(1) in CONFIGURATION_CACHE_SETTINGS:
+            return match.group(2).strip().lower() == "true"
+
+    settings = gradle_settings(path, CONFIGURATION_CACHE_SETTINGS)
+    return any(value.lower() == "true" for value, _ in settings.values())
+
+
+def write_init_script(directory: str) -> str:
+    """
+    Write the init script that reports task events if it is not already written.
+
+    Args:
+        directory (str): Directory to write the init script to.
+
+    Returns:
+        str: Path of the init script.
+    """
+
+    path = os.path.join(directory, "events.init.gradle")
+    try:
+        with open(path, "r") as f:
+            if f.read() == INIT_SCRIPT:
+                return path
+    except OSError:
+        pass
+
+    with open(path, "w") as f:
+        f.write(INIT_SCRIPT)
+    return path
+
+
+def episode_events(output_file: str, ep: str) -> str:
+    """
+    Get the path of the file where task events of the mux of an episode are stored.
+
+    Args:
+        output_file (str): The path to the file where output of the mux is stored.
+        ep (str): Episode being muxed.
+
+    Returns:
+        str: Path of the file.
+    """
+
+    root, _ = os.path.splitext(output_file)
+    return f"{root}-{ep}.events.jsonl"
+
+
+def read_events(events_file: str) -> list[dict] | None:
+    """
+    Read the task events of a mux.
+
+    Args:
+        events_file (str): Path of the file where task events are stored.
+
+    Returns:
+        list[dict] | None: The events in the order they happened; None if gradle did not report any.
+    """
+
+    events = []
+    try:
+        with open(events_file, "r") as f:
+            for line in f:
+                try:
+                    events.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # The build was killed in the middle of writing an event.
+                    continue
+    except OSError:
+        return None
+
+    return events or None
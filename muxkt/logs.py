@@ -0,0 +1,385 @@
+import bisect
+import json
+import mmap
+import os
+import re
+import shutil
+from datetime import datetime, timedelta
+
+import click
+from rich.console import Console
+from rich.text import Text
+
+from .completion import complete_project
+from .utils import exit_with_msg, format_size
+
+console = Console()
+
+# A line offset is saved every this many lines so that line number of a match
+# can be found without counting newlines from the start of the log.
+CHECKPOINT_LINES = 1024
+
+TIME_FORMAT = "%Y%m%d-%H%M%S"
+
+# Archived logs are pruned to these limits whenever a log is archived.
+MAX_LOG_AGE_DAYS = 90
+MAX_LOG_DIR_SIZE = 2 * 1024 * 1024 * 1024
+
+
+@click.group()
+@click.help_option("--help", "-h")
+def log() -> None:
+    """Search and prune the archived output of previous muxes."""
+    pass
+
+
+@log.command()
+@click.pass_context
+@click.help_option("--help", "-h")
+@click.argument("pattern", type=str)
+@click.option(
+    "-p",
+    "--project",
+    type=str,
+    shell_complete=complete_project,
+    help="Only search the logs of this project.",
+)
+@click.option(
+    "-e",
+    "--episode",
+    type=str,
+    help="Only search the logs of this episode.",
+)
+@click.option(
+    "-s",
+    "--since",
+    type=click.DateTime(formats=["%Y-%m-%d", "%Y-%m-%d %H:%M"]),
+    help="Only search the logs of muxes done after this date.",
+)
+@click.option(
+    "-i",
+    "--ignore-case",
+    is_flag=True,
+    help="Ignore case when matching the pattern.",
+)
+def search(
+    ctx: click.Context,
+    pattern: str,
+    project: str | None,
+    episode: str | None,
+    since: datetime | None,
+    ignore_case: bool,
+) -> None:
+    """Search the archived logs for a regex."""
+    """
+    Args:
+        ctx (click.Context): Context passed by click from the entry point.
+        pattern (str): Regex to search for.
+
+    Options:
+        project (str | None): Name of the project whose logs to search; None to search all projects.
+        episode (str | None): Episode whose logs to search; None to search all episodes.
+        since (datetime | None): Only search logs newer than this; None to search all logs.
+        ignore_case (bool): Ignore case when matching. True if user used --ignore-case or -i; otherwise False
+
+    Returns:
+        None
+    """
+
+    flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+    try:
+        regex = re.compile(pattern.encode(), flags)
+    except re.error as e:
+        exit_with_msg(f"Invalid pattern: {e}")
+
+    log_dir = ctx.obj["log_dir"]
+    index = update_log_index(log_dir)
+
+    if episode and episode.isdigit():
+        episode = f"{int(episode):02}"
+
+    found = False
+    for name, entry in sorted(index.items(), key=lambda item: item[1]["time"]):
+        if project and entry["project"] != project:
+            continue
+        if episode and entry["episode"] != episode:
+            continue
+        if since and entry["time"] < since.strftime(TIME_FORMAT):
+            continue
+
+        for line_number, line in search_log(
+            os.path.join(log_dir, name), entry["checkpoints"], regex
+        ):
+            found = True
+            when = datetime.strptime(entry["time"], TIME_FORMAT)
+            text = Text(f'{entry["project"]} {entry["episode"]} ', style="cyan")
+            text.append(f"{when:%Y-%m-%d %H:%M} line {line_number}: ", style="dim")
+            text.append(line)
+            console.print(text, soft_wrap=True)
+
+    if not found:
+        console.print("[cyan]No matches found.[/cyan]")
+
+
+@log.command()
+@click.pass_context
+@click.help_option("--help", "-h")
+@click.option(
+    "-o",
+    "--older-than",
+    type=click.IntRange(min=0),
+    default=MAX_LOG_AGE_DAYS,
+    show_default=True,
+    help="Remove the logs of muxes done more than this many days ago.",
+)
+@click.option(
+    "-m",
+    "--max-size",
+    type=click.IntRange(min=0),
+    default=MAX_LOG_DIR_SIZE // (1024 * 1024),
+    show_default=True,
+    help="Remove the oldest logs until all of them take at most this many MiB.",
+)
+def prune(ctx: click.Context, older_than: int, max_size: int) -> None:
+    """Remove old archived logs."""
+    """
+    Args:
+        ctx (click.Context): Context passed by click from the entry point.
+
+    Options:
+        older_than (int): Days after which a log is removed.
+        max_size (int): MiB that all the logs can take.
+
+    Returns:
+        None
+    """
+
+    removed, size = prune_logs(ctx.obj["log_dir"], older_than, max_size * 1024 * 1024)
+    console.print(f"[cyan]Removed {removed} logs ({format_size(size)}).[/cyan]")
+
+
+def archived_logs(log_dir: str) -> dict[str, tuple[os.DirEntry, re.Match]]:
+    """
+    Find the archived logs.
+
+    Args:
+        log_dir (str): Directory where the logs are archived.
+
+    Returns:
+        dict[str, tuple[os.DirEntry, re.Match]]: Entry of every log and the match of its time and episode keyed by its path relative to log_dir.
+    """
+
+    logs = {}
+    if os.path.isdir(log_dir):
+        for project in os.scandir(log_dir):
+            if not project.is_dir():
+                continue
+            for entry in os.scandir(project.path):
+                match = re.fullmatch(r"(\d{8}-\d{6})_(.+)\.txt", entry.name)
+                if entry.is_file() and match:
+                    logs[f"{project.name}/{entry.name}"] = (entry, match)
+    return logs
+
+
+def prune_logs(
+    log_dir: str, max_age_days: int, max_size: int, keep: str | None = None
+) -> tuple[int, int]:
+    """
+    Remove the archived logs that are older than the maximum age, and then
+    the oldest logs until the rest fit in the maximum size.
+
+    Args:
+        log_dir (str): Directory where the logs are archived.
+        max_age_days (int): Days after which a log is removed.
+        max_size (int): Bytes that all the logs can take.
+        keep (str | None): Path of a log that is never removed; None to not keep any.
+
+    Returns:
+        int: Number of logs removed.
+        int: Bytes removed.
+    """
+
+    oldest = (datetime.now() - timedelta(days=max_age_days)).strftime(TIME_FORMAT)
+    logs = sorted(
+        archived_logs(log_dir).values(), key=lambda log: log[1].group(1), reverse=True
+    )
+
+    removed = 0
+    removed_size = 0
+    total = 0
+    full = False
+    for entry, match in logs:
+        try:
+            size = entry.stat().st_size
+        except OSError:
+            continue
+        if entry.path == keep:
+            total += size
+            continue
+        # Every log older than one that does not fit is removed as well.
+        full = full or total + size > max_size
+        if match.group(1) >= oldest and not full:
+            total += size
+            continue
+
+        try:
+            os.remove(entry.path)
+        except OSError:
+            continue
+        removed += 1
+        removed_size += size
+
+    return removed, removed_size
+
+
+def episode_log(output_file: str, ep: str) -> str:
+    """
+    Get the path of the file where output of the mux of an episode is stored while it runs.
+
+    Args:
+        output_file (str): The path to the file where output of the mux is stored.
+        ep (str): Episode being muxed.
+
+    Returns:
+        str: Path of the file.
+    """
+
+    root, ext = os.path.splitext(output_file)
+    return f"{root}-{ep}{ext}"
+
+
+def archive_log(log_dir: str, project: str, ep: str, output_file: str) -> str:
+    """
+    Save the output of the mux of an episode to the archive.
+
+    Args:
+        log_dir (str): Directory where the logs are archived.
+        project (str): Name of the project that was muxed.
+        ep (str): Episode that was muxed.
+        output_file (str): The path to the file where output of the mux is stored.
+
+    Returns:
+        str: Path of the archived log.
+    """
+
+    project_dir = os.path.join(log_dir, project)
+    os.makedirs(project_dir, exist_ok=True)
+
+    archive = os.path.join(
+        project_dir, f"{datetime.now().strftime(TIME_FORMAT)}_{ep}.txt"
+    )
+
+    # The output file is replaced, not rewritten, by the next mux so a hard
+    # link keeps its content without copying large logs.
+    try:
+        os.link(output_file, archive)
+    except OSError:
+        shutil.copyfile(output_file, archive)
+
+    prune_logs(log_dir, MAX_LOG_AGE_DAYS, MAX_LOG_DIR_SIZE, keep=archive)
+    return archive
+
+
+def index_log(path: str) -> list[int]:
+    """
+    Find the offset of every CHECKPOINT_LINES-th line of the log.
+
+    Args:
+        path (str): Path of the log.
+
+    Returns:
+        list[int]: Offsets of the lines; first element is the offset of the first line.
+    """
+
+    checkpoints = [0]
+    offset = 0
+    with open(path, "rb") as f:
+        for i, line in enumerate(f, start=1):
+            offset += len(line)
+            if i % CHECKPOINT_LINES == 0:
+                checkpoints.append(offset)
+
+    return checkpoints
+
+
+def update_log_index(log_dir: str) -> dict:
+    """
+    Add the logs that were archived since the last search to the index.
+
+    Args:
+        log_dir (str): Directory where the logs are archived.
+
+    Returns:
+        dict: Index entry of every archived log keyed by its path relative to log_dir.
+    """
+
+    index_file = os.path.join(log_dir, "index.json")
+    try:
+        with open(index_file, "r") as f:
+            index = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        index = {}
+
+    logs = archived_logs(log_dir)
+    changed = set(index) != set(logs)
+    for name, (entry, match) in logs.items():
+        size = entry.stat().st_size
+        if name in index and index[name]["size"] == size:
+            continue
+
+        index[name] = {
+            "project": os.path.dirname(name),
+            "episode": match.group(2),
+            "time": match.group(1),
+            "size": size,
+            "checkpoints": index_log(entry.path),
+        }
+        changed = True
+
+    index = {name: index[name] for name in logs}
+
+    if changed:
+        os.makedirs(log_dir, exist_ok=True)
+        with open(index_file, "w") as f:
+            json.dump(index, f)
+
+    return index
+
+
+def search_log(path: str, checkpoints: list[int], regex: re.Pattern):
+    """
+    Search the log for the regex without reading the whole file into memory.
+
+    Args:
+        path (str): Path of the log.
+        checkpoints (list[int]): Line offsets of the log from the index.
+        regex (re.Pattern): Compiled bytes regex to search for.
+
+    Yields:
+        tuple[int, str]: Line number and the text of every line that matches.
+    """
+
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            last_line_start = -1
+            for match in regex.finditer(mm):
+                line_start = mm.rfind(b"\n", 0, match.start()) + 1
+                if line_start == last_line_start:
+                    continue
+                last_line_start = line_start
+
+                line_end = mm.find(b"\n", match.start())
+                if line_end == -1:
+                    line_end = len(mm)
+
+                checkpoint = bisect.bisect_right(checkpoints, line_start) - 1
+                line_number = (
+                    checkpoint * CHECKPOINT_LINES
+                    + mm[checkpoints[checkpoint] : line_start].count(b"\n")
+                    + 1
+                )
+
+                yield line_number, mm[line_start:line_end].decode(errors="replace")
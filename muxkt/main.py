@@ -5,7 +5,13 @@ import click
 from rich.traceback import install
 
 from .config import config
+from .distributed import worker
+from .doctor import doctor
+from .logs import log
 from .mux import mux
+from .timings import timings
+from .utils import get_app_files
+from .verify import verify
 
 install(show_locals=True, suppress=[click])
 
@@ -13,15 +19,44 @@ install(show_locals=True, suppress=[click])
 @click.group()
 @click.version_option()
 @click.help_option("--help", "-h")
+@click.option(
+    "--trace-timings",
+    is_flag=True,
+    help="Print how long each phase of muxkt took.",
+)
+@click.option(
+    "--trace-output",
+    type=click.Path(dir_okay=False),
+    help="Write the timings as a Chrome trace, or as cProfile stats if the file ends with '.prof'.",
+)
 @click.pass_context
-def cli(ctx: click.Context) -> None:
+def cli(ctx: click.Context, trace_timings: bool, trace_output: str | None) -> None:
+    if trace_timings or trace_output:
+        timings.enable(profile=bool(trace_output and trace_output.endswith(".prof")))
+        ctx.call_on_close(lambda: finish_timings(trace_timings, trace_output))
+
+    with timings.phase("config load"):
+        load_config(ctx)
+
+
+def load_config(ctx: click.Context) -> None:
+    """
+    Read the config and store it along with paths of the files muxkt uses in the context.
+
+    Args:
+        ctx (click.Context): Context passed by click from the entry point.
+
+    Returns:
+        None
+    """
+
     config_file_path = click.get_app_dir("muxkt")
 
     if not os.path.exists(config_file_path):
         os.makedirs(config_file_path)
 
-    config_file = os.path.join(config_file_path, "config")
-    output_file = os.path.join(config_file_path, "output.txt")
+    files = get_app_files(config_file_path)
+    config_file = files["config_file"]
 
     config = configparser.ConfigParser()
 
@@ -33,11 +68,31 @@ def cli(ctx: click.Context) -> None:
 
     ctx.obj = {
         "config_file_path": config_file_path,
-        "config_file": config_file,
         "config": config,
-        "output_file": output_file,
-    }
+    } | files
+
+
+def finish_timings(trace_timings: bool, trace_output: str | None) -> None:
+    """
+    Print and write the timings of the run.
+
+    Args:
+        trace_timings (bool): Print the timings of each phase.
+        trace_output (str | None): Path of the file to write the timings to; None to not write them.
+
+    Returns:
+        None
+    """
+
+    if trace_timings:
+        timings.report()
+    if trace_output:
+        timings.write(trace_output)
 
 
 cli.add_command(config)
+cli.add_command(doctor)
+cli.add_command(log)
 cli.add_command(mux)
+cli.add_command(verify)
+cli.add_command(worker)
@@ -1,20 +1,61 @@
+import configparser
+import json
 import os
+import queue
 import re
-import subprocess
+import shutil
 import sys
+import threading
+from datetime import datetime
 
 import click
 from rich.console import Console
 from rich.table import Table
 from rich.text import Text
 
+from .completion import complete_episode, complete_project
 from .config import add_history, get_history, read_config
+from .distributed import run_remote
+from .eta import Durations, EtaStatus, format_duration
+from .events import (
+    configuration_cache_enabled,
+    episode_events,
+    read_events,
+    write_init_script,
+)
+from .logs import archive_log, episode_log
+from .parsing import (
+    find_transient_failures,
+    parse_failures,
+    parse_success,
+    parse_warnings,
+)
+from .prefetch import Prefetcher
+from .scheduler import Scheduler, resolve_jobs, run_commands
 from .selection import fzf
-from .utils import check_dependencies, exit_with_msg, msg_in_box
+from .staging import Transfers, remove_empty_folders, staged_files
+from .tasks import build_command, find_missing_tasks
+from .timings import timings
+from .utils import (
+    arc_name,
+    check_dependencies,
+    exit_with_msg,
+    format_size,
+    msg_in_box,
+)
+from .verify import get_mux_results, show_verify_results, verify_files
 
 console = Console()
 
 
+def validate_jobs(ctx: click.Context, param: click.Parameter, value: str) -> str:
+    """Check that jobs is either 'auto' or a positive number."""
+
+    if value == "auto" or (value.isdigit() and int(value) > 0):
+        return value
+    raise click.BadParameter("must be 'auto' or a positive number.")
+
+
 @click.command()
 @click.pass_context
 @click.help_option("--help", "-h")
@@ -22,12 +63,14 @@ console = Console()
     "project",
     required=False,
     nargs=1,
+    shell_complete=complete_project,
 )
 @click.argument(
     "episode",
     required=False,
     nargs=-1,
     type=int,
+    shell_complete=complete_episode,
 )
 @click.option(
     "-r",
@@ -48,6 +91,90 @@ console = Console()
     multiple=True,
     help="Provide multiple custom Gradle flags (e.g., -Pkey=value).",
 )
+@click.option(
+    "-v",
+    "--verify",
+    is_flag=True,
+    help="Verify CRC and track list of the muxed files.",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=str,
+    default="1",
+    show_default=True,
+    callback=validate_jobs,
+    help="Maximum episodes to mux at the same time, or 'auto'. Fewer are run when memory, cpu or disk is under pressure.",
+)
+@click.option(
+    "--retries",
+    type=click.IntRange(min=0),
+    default=2,
+    show_default=True,
+    help="Times to mux an episode again when it fails because of a transient error.",
+)
+@click.option(
+    "--retry-delay",
+    type=click.FloatRange(min=0),
+    default=10,
+    show_default=True,
+    help="Seconds to wait before the first retry. It doubles with every retry.",
+)
+@click.option(
+    "-w",
+    "--worker",
+    type=str,
+    multiple=True,
+    help="Mux on a worker started with 'muxkt worker' ('host:port' or 'unix:/path'). Can be used multiple times.",
+)
+@click.option(
+    "--worker-token",
+    type=str,
+    envvar="MUXKT_WORKER_TOKEN",
+    help="Token expected by the workers.",
+)
+@click.option(
+    "-p",
+    "--plan",
+    is_flag=True,
+    help="Show the commands that would be run with their estimated time and exit.",
+)
+@click.option(
+    "--prefetch",
+    is_flag=True,
+    help="Read the input files of the next episode into memory while the current one muxes.",
+)
+@click.option(
+    "--prefetch-budget",
+    type=click.IntRange(min=1),
+    default=2048,
+    show_default=True,
+    help="Maximum MiB of input of an episode to prefetch.",
+)
+@click.option(
+    "-a",
+    "--arc",
+    "arcs",
+    type=str,
+    multiple=True,
+    help="Arc/season of a project with alternate folder structure, optionally with its episodes (e.g. 's2' or 's2:1-6,9'). Can be used multiple times.",
+)
+@click.option(
+    "--all-arcs",
+    is_flag=True,
+    help="Mux all the arcs/seasons of a project with alternate folder structure.",
+)
+@click.option(
+    "--no-events",
+    is_flag=True,
+    help="Do not pass the init script that reports task events to gradle. It is never passed when the configuration cache is on.",
+)
+@click.option(
+    "--stage",
+    type=click.Path(file_okay=False, resolve_path=True),
+    envvar="MUXKT_STAGE_DIR",
+    help="Mux to this folder (e.g. tmpfs or a local SSD) and move the files to the project in the background. The project has to write its output under the 'muxkt.stage' gradle property.",
+)
 def mux(
     ctx: click.Context,
     project: str | None,
@@ -55,6 +182,19 @@ def mux(
     repeat: bool,
     output: bool,
     custom_flag: tuple,
+    verify: bool,
+    jobs: str,
+    retries: int,
+    retry_delay: float,
+    worker: tuple,
+    worker_token: str | None,
+    plan: bool,
+    prefetch: bool,
+    prefetch_budget: int,
+    arcs: tuple,
+    all_arcs: bool,
+    no_events: bool,
+    stage: str | None,
 ) -> None:
     """Mux the episodes using the arguments and the options provided by the user."""
     """
@@ -67,6 +207,19 @@ def mux(
         repeat_last (bool): Mux using last mux settings. True if user used --repeat or --r option; otherwise False
         output (bool): Show output of last mux verbatim and exit. True if user used --output or --o; otherwise False
         custom_flag (str): Custom flag that user wants to append to the gradle command
+        verify (bool): Verify the muxed files after each successful mux. True if user used --verify or -v; otherwise False
+        jobs (str): Maximum number of episodes to mux at the same time; 'auto' to decide from the cpu count.
+        retries (int): Times to mux an episode again when it fails because of a transient error.
+        retry_delay (float): Seconds to wait before the first retry; doubled for every retry after that.
+        worker (tuple): Addresses of the workers to mux on; empty to mux on this computer.
+        worker_token (str | None): Token to send to the workers.
+        plan (bool): Show the commands and their estimated time instead of muxing. True if user used --plan or -p; otherwise False
+        prefetch (bool): Prefetch the input files of the next episode. True if user used --prefetch; otherwise False
+        prefetch_budget (int): Maximum MiB of input of an episode to prefetch.
+        arcs (tuple): Arcs to mux with their episodes, like 's2:1-6,9'; empty to select them.
+        all_arcs (bool): Mux all the arcs. True if user used --all-arcs; otherwise False
+        no_events (bool): Do not get task events from gradle. True if user used --no-events; otherwise False
+        stage (str | None): Folder to mux to before moving the files to the project; None to mux to the project.
 
     Returns:
         None
@@ -75,173 +228,619 @@ def mux(
     if output:
         cat_output(ctx)
 
-    check_dependencies()
+    if worker and verify:
+        raise click.UsageError("--verify cannot be used with --worker.")
+
+    if stage and (worker or verify):
+        raise click.UsageError("--stage cannot be used with --worker or --verify.")
+
+    # Only workers need the dependencies when muxing on workers.
+    if not worker:
+        with timings.phase("check dependencies"):
+            check_dependencies()
 
     if repeat:
         project_name, path, episode, custom_flag = get_history(ctx)
     else:
-        project_name, path, episode = get_project_info(ctx, project, episode)
-
-    add_history(ctx, project_name, path, episode, custom_flag)
+        with timings.phase("project info"):
+            project_name, path, episode = get_project_info(
+                ctx, project, episode, arcs, all_arcs
+            )
 
     output_file = ctx.obj["output_file"]
 
+    # Workers mux in their own copy of the project, which need not exist here.
     try:
-        os.chdir(path)
+        with timings.phase("chdir"):
+            os.chdir(path)
     except FileNotFoundError:
-        exit_with_msg(f"The path '{path}' does not exist.")
+        if not worker:
+            exit_with_msg(f"The path '{path}' does not exist.")
     except PermissionError:
-        exit_with_msg(f"You do not have permission to access '{path}'.")
+        if not worker:
+            exit_with_msg(f"You do not have permission to access '{path}'.")
+
+    with timings.phase("check tasks"):
+        check_tasks(ctx, project_name, path, episode)
+
+    jobs = resolve_jobs(jobs)
+    # Gradle on the workers cannot read the init script from this computer.
+    init_script = None
+    if not (worker or no_events or configuration_cache_enabled(path, custom_flag)):
+        init_script = write_init_script(ctx.obj["config_file_path"])
+    # Every episode is muxed to its own folder so that its files can be
+    # told apart from those of the episodes muxing at the same time.
+    stage_dirs = {}
+    if stage:
+        stage_dirs = {ep: os.path.join(stage, project_name, ep) for ep in episode}
+
+    commands = [
+        (
+            ep,
+            build_command(
+                (
+                    [*custom_flag, f"-Pmuxkt.stage={stage_dirs[ep]}"]
+                    if stage
+                    else custom_flag
+                ),
+                ep,
+                init_script,
+                episode_events(output_file, ep),
+            ),
+            episode_log(output_file, ep),
+        )
+        for ep in episode
+    ]
+
+    durations = Durations(ctx.obj["durations_file"])
+    if plan:
+        show_plan(project_name, commands, durations, jobs)
+        return
 
+    add_history(ctx, project_name, path, episode, custom_flag)
+
+    for stage_dir in stage_dirs.values():
+        # Leftovers of an earlier mux would be moved to the project.
+        shutil.rmtree(stage_dir, ignore_errors=True)
+        os.makedirs(stage_dir)
+    transfers = Transfers() if stage else None
+
+    # The output of finished episodes is parsed and printed on another thread
+    # so that the next episode can start muxing right away. It gets the
+    # results in order so the output stays in order.
+    renders = queue.Queue()
+    render_errors = []
+
+    def render() -> None:
+        while (result := renders.get()) is not None:
+            if render_errors:
+                continue
+            try:
+                render_result(ctx, project_name, result, verify)
+            # Parsing the output can exit with a message. The exit stops the
+            # batch and is raised again on the main thread.
+            except BaseException as e:
+                render_errors.append(e)
+
+    retry_reasons = {}
+
+    def should_retry(ep: str, returncode: int, attempt: int) -> float | None:
+        if attempt > retries:
+            return None
+
+        reasons = find_transient_failures(episode_log(output_file, ep))
+        if not reasons:
+            return None
+
+        # Shown with the result of the episode to keep the output in order.
+        retry_reasons.setdefault(ep, []).append(reasons[0])
+        return retry_delay * 2 ** (attempt - 1)
+
+    # Workers read their own files so there is nothing to prefetch here.
+    prefetcher = None
+    if prefetch and not worker:
+        prefetcher = Prefetcher(
+            prefetch_budget * 1024 * 1024, path, ctx.obj["log_dir"], project_name
+        )
+    started = set()
+
+    def prefetch_next(running: list[str]) -> None:
+        for ep in running:
+            if ep not in started:
+                started.add(ep)
+                prefetcher.started(ep)
+
+        upcoming = [ep for ep in episode if ep not in started]
+        if upcoming:
+            prefetcher.prefetch(upcoming[0])
+
+    results = []
+    eta = EtaStatus(project_name, episode, durations)
     click.clear()
-    for ep in episode:
-        cmdfile = "./gradlew" if os.name == "posix" else "gradlew.bat"
-        command = [cmdfile, "--console=plain"]
-        if custom_flag:
-            command.extend(custom_flag)
-        command.append(f"mux.{ep}")
+    try:
+        with console.status(eta):
+
+            def show_running(running: list[str]) -> None:
+                eta.update(running)
+                if prefetcher:
+                    with timings.phase("prefetch"):
+                        prefetch_next(running)
+
+            if worker:
+                runs = run_remote(
+                    list(worker),
+                    worker_token,
+                    project_name,
+                    list(custom_flag),
+                    [(ep, log) for ep, _, log in commands],
+                    show_running,
+                    should_retry,
+                )
+            else:
+                runs = run_commands(
+                    commands, Scheduler(jobs), show_running, should_retry
+                )
+
+            renderer = threading.Thread(target=render, daemon=True)
+            renderer.start()
+            try:
+                for result in runs:
+                    if render_errors:
+                        break
+
+                    ep = result["name"]
+                    result = result | {"retry_reasons": retry_reasons.get(ep, [])}
+                    results.append(result)
+                    eta.finished(ep)
+                    if result["returncode"] == 0:
+                        durations.record(project_name, ep, result["duration"])
+                        durations.save()
+                    if transfers and result["returncode"] == 0:
+                        for source, destination in staged_files(stage_dirs[ep], path):
+                            transfers.add(source, destination)
+                    elif transfers:
+                        shutil.rmtree(stage_dirs[ep], ignore_errors=True)
+                    renders.put(result)
+            finally:
+                # Stops the muxes that are still running.
+                runs.close()
+                renders.put(None)
+                renderer.join()
+
+            if render_errors:
+                raise render_errors[0]
+
+    except Exception as e:
+        exit_with_msg(f"Error during muxing: {e}")
+
+    if transfers:
+        with console.status(
+            f"[cyan]Moving {transfers.pending} muxed files to the project...[/cyan]"
+        ):
+            transfers.wait()
+        remove_empty_folders(os.path.join(stage, project_name))
+
+    show_summary(project_name, results)
+    record_usage(ctx.obj["usage_file"], project_name, results, jobs)
+
+    if transfers:
+        throughput = transfers.throughput()
+        console.print(
+            f"Moved {transfers.files} files ({format_size(transfers.transferred)}) "
+            f"from the staging folder at "
+            + (f"{format_size(throughput)}/s" if throughput else "unknown speed")
+            + f", up to {transfers.max_depth} files queued"
+        )
+        for failure in transfers.failures:
+            console.print(f"[bold red]Could not move {failure}[/bold red]")
+
+    if prefetcher:
+        prefetcher.close()
+        hit_rate = prefetcher.hit_rate()
+        console.print(
+            f"Prefetched {format_size(prefetcher.prefetched)} of input, hit rate "
+            + (f"{hit_rate:.0%}" if hit_rate is not None else "unknown")
+        )
 
-        try:
-            with console.status(f'[cyan]Muxing "{project_name}" - Episode {ep}[/cyan]'):
-                with open(output_file, "w") as f:
-                    result = subprocess.run(command, stdout=f, stderr=f, text=True)
 
-            console.print(f'[cyan]Muxing "{project_name}" - Episode {ep}[/cyan]')
-            if result.returncode == 0:
-                mux_success(output_file)
+def render_result(
+    ctx: click.Context, project_name: str, result: dict, verify: bool
+) -> None:
+    """
+    Archive the output of a muxed episode and print what happened.
+
+    Args:
+        ctx (click.Context): Context passed by click from the entry point.
+        project_name (str): Name of the project.
+        result (dict): Result of the mux of the episode.
+        verify (bool): Verify the muxed file.
+
+    Returns:
+        None
+    """
+
+    ep = result["name"]
+    output_file = ctx.obj["output_file"]
+
+    # Keep the output of the episode for 'muxkt mux -o'.
+    with timings.phase("archive log", episode=ep):
+        os.replace(episode_log(output_file, ep), output_file)
+        archive_log(ctx.obj["log_dir"], project_name, ep, output_file)
+
+    events_file = episode_events(output_file, ep)
+    events = read_events(events_file)
+    if events is not None:
+        os.remove(events_file)
+
+    console.print(f'[cyan]Muxing "{project_name}" - Episode {ep}[/cyan]')
+    for attempt, reason in enumerate(result.get("retry_reasons", []), start=1):
+        console.print(
+            f"[yellow]Attempt {attempt} failed with a transient error: {reason}. "
+            "Muxed again.[/yellow]"
+        )
+    if result["returncode"] == 0:
+        mux_success(output_file, events)
+        if verify:
+            verify_output(ctx, output_file)
+    else:
+        mux_warning(output_file)
+        mux_failure(output_file, events)
+
+    console.rule()
+
+
+def show_plan(
+    project_name: str,
+    commands: list[tuple[str, list[str], str]],
+    durations: Durations,
+    jobs: int,
+) -> None:
+    """
+    Print the commands that would be run to mux the episodes with their estimated time.
+
+    Args:
+        project_name (str): Name of the project.
+        commands (list[tuple[str, list[str], str]]): Episode, command and the file to store the output of each mux.
+        durations (Durations): Past durations of the muxes.
+        jobs (int): Maximum number of episodes to mux at the same time.
+
+    Returns:
+        None
+    """
+
+    console.rule(Text(f'PLAN: "{project_name}"', style="bold green"))
+    table = Table(row_styles=["dim", "none"])
+    table.add_column("Episode")
+    table.add_column("Command")
+    table.add_column("Estimated")
+
+    estimates = []
+    for ep, command, _ in commands:
+        estimate = durations.estimate(project_name, ep)
+        estimates.append(estimate)
+        table.add_row(ep, " ".join(command), format_duration(estimate))
+
+    console.print(table)
+
+    if None in estimates:
+        console.print("Total: unknown (some episodes were never muxed)")
+        return
+
+    total = sum(estimates)
+    console.print(f"Total: ~{format_duration(total)} one at a time", end="")
+    if jobs > 1 and len(estimates) > 1:
+        console.print(
+            f", ~{format_duration(total / min(jobs, len(estimates)))} with up to {jobs} at a time",
+            end="",
+        )
+    console.print()
+
+
+def show_summary(project_name: str, results: list[dict]) -> None:
+    """
+    Print the summary of all the episodes that were muxed. Nothing is printed
+    for a single episode that was muxed on the first try without measuring
+    the resources it used.
+
+    Args:
+        project_name (str): Name of the project.
+        results (list[dict]): Result of the mux of every episode.
+
+    Returns:
+        None
+    """
+
+    measured = any("usage" in result for result in results)
+    if (
+        len(results) < 2
+        and not measured
+        and not any(result["retries"] for result in results)
+    ):
+        return
+
+    console.rule(Text(f'SUMMARY: "{project_name}"', style="bold green"))
+    table = Table(row_styles=["dim", "none"])
+    table.add_column("Episode")
+    table.add_column("Status")
+    table.add_column("Time")
+    table.add_column("Retries")
+    table.add_column("Retried because of")
+    remote = any("worker" in result for result in results)
+    if remote:
+        table.add_column("Worker")
+    if measured:
+        table.add_column("CPU", justify="right")
+        table.add_column("Peak RSS", justify="right")
+        table.add_column("I/O", justify="right")
+
+    for result in results:
+        status = (
+            "[green]SUCCESS[/green]"
+            if result["returncode"] == 0
+            else "[bold red]FAILED[/bold red]"
+        )
+        row = [
+            result["name"],
+            status,
+            format_duration(result["duration"]),
+            str(result["retries"]),
+            "\n".join(result["retry_reasons"]),
+        ]
+        if remote:
+            row.append(result.get("worker", ""))
+        if measured:
+            usage = result.get("usage")
+            if usage and usage["user"] is not None:
+                row.append(f"{usage['user'] + usage['system']:.1f}s")
             else:
-                mux_warning(output_file)
-                mux_failure(output_file)
+                row.append("")
+            row.append(format_size(usage["peak_rss"]) if usage else "")
+            row.append(format_size(usage["read"] + usage["written"]) if usage else "")
+        table.add_row(*row)
+
+    console.print(table)
+
+
+def record_usage(
+    usage_file: str, project_name: str, results: list[dict], jobs: int
+) -> None:
+    """
+    Append the resources used by the mux of every episode to the usage file,
+    one JSON object per line.
+
+    Args:
+        usage_file (str): Path of the file where resource usage is recorded.
+        project_name (str): Name of the project.
+        results (list[dict]): Result of the mux of every episode.
+        jobs (int): Maximum number of episodes that were muxed at the same time.
+
+    Returns:
+        None
+    """
 
-            console.rule()
+    timestamp = datetime.now().isoformat(timespec="seconds")
+    with open(usage_file, "a") as f:
+        for result in results:
+            if "usage" not in result:
+                continue
+            record = {
+                "time": timestamp,
+                "project": project_name,
+                "episode": result["name"],
+                "returncode": result["returncode"],
+                "retries": result["retries"],
+                "jobs": jobs,
+            } | result["usage"]
+            f.write(json.dumps(record) + "\n")
+
+
+def check_tasks(
+    ctx: click.Context,
+    project_name: str,
+    path: str,
+    episode: list[str],
+) -> None:
+    """
+    Check that the mux task of every episode exists before gradle is started.
+    Exits the program with suggestions if any task does not exist.
+
+    Args:
+        ctx (click.Context): Context passed by click from the entry point.
+        project_name (str): Name of the project.
+        path (str): Path of the project.
+        episode (list[str]): List of all the episodes that needs to be muxed.
+
+    Returns:
+        None
+    """
+
+    invalid = find_missing_tasks(
+        path, episode, ctx.obj["tasks_cache"], ctx.obj["properties_cache"]
+    )
+    if not invalid:
+        return
+
+    messages = []
+    for name, suggestions in invalid.items():
+        message = f"Task 'mux.{name}' not found in project '{project_name}'."
+        if suggestions:
+            message += " Did you mean: " + ", ".join(f"mux.{s}" for s in suggestions)
+        messages.append(message)
 
-        except Exception as e:
-            exit_with_msg(f"Error during muxing: {e}")
+    exit_with_msg("\n".join(messages))
 
 
-def mux_success(output_file: str) -> None:
+def mux_success(output_file: str, events: list[dict] | None = None) -> None:
     """
     Process the muxing outpt file and display categorized results.
 
     Args:
         output_file (str): The path to the file where output of the mux is stored.
+        events (list[dict] | None): Task events reported by gradle; None to read the tasks from the output file.
 
     Returns:
         None
     """
 
-    try:
-        with open(output_file, "r") as f:
-            lines = f.read()
-    except FileNotFoundError:
-        exit_with_msg("Output file not found.")
-
-    patterns_and_headers = [
-        (r"> Task :([^S].*)", "TASKS PERFORMED:"),
-        (r"(CHAPTER.*)", "CHAPTERS GENERATED:"),
-        (r"(Track.*])", "TRACK LIST:"),
-        (r"Attaching (.*[otOT][tT][fF])", "FONTS ATTACHED:"),
-        (r"(Validating fonts.*|warning: .*)", "WARNINGS:"),
-        (r"Attaching (.*[otOT][tT][fF])", "DUPLICATE FONTS ATTACHED:"),
-        (r"Output: (.*mkv)", "OUTPUT:"),
-        (r"(\d+ actionable tasks:.*)", ""),
-        (r"(BUILD SUCCESSFUL in .*s)", ""),
-    ]
+    with timings.phase("parse"):
+        try:
+            sections, tasks = parse_success(output_file, events)
+        except FileNotFoundError:
+            exit_with_msg("Output file not found.")
 
-    for pattern, header in patterns_and_headers:
-        matches = [match.group(1) for match in re.finditer(pattern, lines)]
+    for header, matches in sections:
         if not matches:
             continue
 
-        # Process results based on the header
         if header == "WARNINGS:":
             mux_warning(output_file)
             continue
 
-        elif header == "TASKS PERFORMED:":
-            console.rule(Text(header, style="bold green"))
-            matches = [match.replace(".default", "") for match in matches]
+        if header == "TASKS PERFORMED:" and tasks:
+            with timings.phase("render"):
+                render_task_events(tasks)
+            continue
 
-            table = Table(row_styles=["dim", "none"])
-            table.add_column(style="dim")
+        if header == "OUTPUT:":
+            matches = [os.path.relpath(match) for match in matches]
 
-            for i, item in enumerate(matches):
-                match = re.compile(r"([^.]+)\.([^\s]+)( UP-TO-DATE)?").match(item)
-                if not match:
-                    continue
+        with timings.phase("render"):
+            render_section(header, matches)
 
-                number_padded = str(i + 1)
-                name_part = match.group(1)
-                after_dot_part = match.group(2)
-                status = match.group(3) or "EXECUTED"
-                if i == 0:  # Set the header only once
-                    table.add_column(f"Task performed for {after_dot_part}")
-                    table.add_column("Status")
-                table.add_row(number_padded, name_part, status.strip())
 
-            console.print(table)
+def render_task_events(tasks: list[dict]) -> None:
+    """
+    Display the tasks that gradle reported with their outcome and duration.
 
-        elif header == "FONTS ATTACHED:":
-            console.rule(Text(header, style="bold green"))
-            matches.sort()
-            table = Table(show_header=False, row_styles=["dim", "none"])
+    Args:
+        tasks (list[dict]): Events of the tasks that finished.
+
+    Returns:
+        None
+    """
+
+    console.rule(Text("TASKS PERFORMED:", style="bold green"))
+    table = Table(row_styles=["dim", "none"])
+    table.add_column(style="dim")
+
+    # Same tasks that gradle shows in its output.
+    tasks = [task for task in tasks if not task["task"].startswith(":S")]
+    for i, task in enumerate(tasks):
+        name = task["task"].removeprefix(":").replace(".default", "")
+        match = re.compile(r"([^.]+)\.([^\s]+)").match(name)
+        if not match:
+            continue
+
+        if len(table.columns) == 1:  # Set the header only once
+            table.add_column(f"Task performed for {match.group(2)}")
+            table.add_column("Status")
+            table.add_column("Time", justify="right")
+        table.add_row(
+            str(i + 1),
+            match.group(1),
+            task["outcome"],
+            f"{task['duration'] / 1000:.1f}s",
+        )
+
+    console.print(table)
+
+
+def render_section(header: str, matches: list[str]) -> None:
+    """
+    Display a section of the result of a successful mux.
+
+    Args:
+        header (str): Header of the section.
+        matches (list[str]): Lines of the output that belong to the section.
+
+    Returns:
+        None
+    """
 
-            for index, font in enumerate(matches, start=1):
-                table.add_row(str(index), font)
+    if header == "TASKS PERFORMED:":
+        console.rule(Text(header, style="bold green"))
+        matches = [match.replace(".default", "") for match in matches]
 
-            console.print(table)
+        table = Table(row_styles=["dim", "none"])
+        table.add_column(style="dim")
 
-        elif header == "DUPLICATE FONTS ATTACHED:":
-            matches = list(set(item for item in matches if matches.count(item) > 1))
-            if not matches:
+        for i, item in enumerate(matches):
+            match = re.compile(r"([^.]+)\.([^\s]+)( UP-TO-DATE)?").match(item)
+            if not match:
                 continue
 
-            console.rule(Text(header, style="bold green"))
-            table = Table(show_header=False, row_styles=["dim", "none"])
+            number_padded = str(i + 1)
+            name_part = match.group(1)
+            after_dot_part = match.group(2)
+            status = match.group(3) or "EXECUTED"
+            if i == 0:  # Set the header only once
+                table.add_column(f"Task performed for {after_dot_part}")
+                table.add_column("Status")
+            table.add_row(number_padded, name_part, status.strip())
 
-            for index, font in enumerate(matches, start=1):
-                table.add_row(str(index), font)
+        console.print(table)
 
-            console.print(table)
+    elif header == "FONTS ATTACHED:":
+        console.rule(Text(header, style="bold green"))
+        matches.sort()
+        table = Table(show_header=False, row_styles=["dim", "none"])
 
-        elif header == "TRACK LIST:":
-            console.rule(Text(header, style="bold green"))
-            table = Table(row_styles=["dim", "none"])
-            table.add_column("Track")
-            table.add_column("Metadata")
-            table.add_column("File")
+        for index, font in enumerate(matches, start=1):
+            table.add_row(str(index), font)
+
+        console.print(table)
 
-            pattern = r"Track (\w+) \((.*?)\) \[(.*?)\]$"
+    elif header == "DUPLICATE FONTS ATTACHED:":
+        matches = list(set(item for item in matches if matches.count(item) > 1))
+        if not matches:
+            return
 
-            for item in matches:
-                match = re.search(pattern, item)
-                if match:
-                    table.add_row(match.group(1), match.group(2), match.group(3))
+        console.rule(Text(header, style="bold green"))
+        table = Table(show_header=False, row_styles=["dim", "none"])
 
-            console.print(table)
+        for index, font in enumerate(matches, start=1):
+            table.add_row(str(index), font)
 
-        elif header == "CHAPTERS GENERATED:":
-            console.rule(Text(header, style="bold green"))
-            table = Table(row_styles=["dim", "none"])
-            table.add_column("Name", justify="left")
-            table.add_column("Timestamp", justify="left")
+        console.print(table)
+
+    elif header == "TRACK LIST:":
+        console.rule(Text(header, style="bold green"))
+        table = Table(row_styles=["dim", "none"])
+        table.add_column("Track")
+        table.add_column("Metadata")
+        table.add_column("File")
+
+        pattern = r"Track (\w+) \((.*?)\) \[(.*?)\]$"
 
-            for i in range(0, len(matches), 2):
-                line1 = matches[i]
-                line2 = matches[i + 1]
+        for item in matches:
+            match = re.search(pattern, item)
+            if match:
+                table.add_row(match.group(1), match.group(2), match.group(3))
 
-                _, value1 = line1.split("=")
-                _, value2 = line2.split("=")
+        console.print(table)
 
-                table.add_row(value2, value1)
-            console.print(table)
+    elif header == "CHAPTERS GENERATED:":
+        console.rule(Text(header, style="bold green"))
+        table = Table(row_styles=["dim", "none"])
+        table.add_column("Name", justify="left")
+        table.add_column("Timestamp", justify="left")
 
-        else:
-            if header:
-                console.rule(Text(header, style="bold green"))
-            for match in matches:
-                click.echo(match)
-        console.print()
+        for i in range(0, len(matches), 2):
+            line1 = matches[i]
+            line2 = matches[i + 1]
+
+            _, value1 = line1.split("=")
+            _, value2 = line2.split("=")
+
+            table.add_row(value2, value1)
+        console.print(table)
+
+    else:
+        if header:
+            console.rule(Text(header, style="bold green"))
+        for match in matches:
+            click.echo(match)
+    console.print()
 
 
 def mux_warning(output_file: str) -> None:
@@ -256,142 +855,78 @@ def mux_warning(output_file: str) -> None:
         None
     """
 
-    try:
-        with open(output_file, "r") as f:
-            lines = f.readlines()
-    except FileNotFoundError:
-        exit_with_msg("Output file not found.")
-
-    # Try to group warnings for each subtitle separately
-    grouped = []
-    current_group = []
-    for line in lines:
-        if re.search(r"[vV]alidating fonts for.*", line):
-            if current_group:
-                grouped.append(current_group)
-            current_group = [line.strip()[:-3]]
-        elif re.search(r"[wW]arning: .*", line):
-            warning = re.sub(r"^.*[wW]arning: (.*).*$", r"\1", line)
-            if current_group:
-                current_group.append(warning.strip())
-
-    if current_group:
-        grouped.append(current_group)
+    with timings.phase("parse"):
+        try:
+            grouped = parse_warnings(output_file)
+        except FileNotFoundError:
+            exit_with_msg("Output file not found.")
 
     # Bail out early if there are not warnings collected.
     if not grouped:
         return
 
-    # Print warnings
-    console.rule(Text("WARNINGS:", style="bold green"))
-    for group in grouped:
-        title = group.pop(0)
+    with timings.phase("render"):
+        # Print warnings
+        console.rule(Text("WARNINGS:", style="bold green"))
+        for group in grouped:
+            title = group.pop(0)
 
-        text = Text()
-        if not group:
-            group.append("No issues were found.")
+            text = Text()
+            if not group:
+                group.append("No issues were found.")
 
-        for txt in group:
-            style = "bold magenta" if "not found" in txt else None
-            text.append(txt, style=style)
-            text.append("\n")
+            for txt in group:
+                style = "bold magenta" if "not found" in txt else None
+                text.append(txt, style=style)
+                text.append("\n")
 
-        msg_in_box(title, text)
-        console.print()
+            msg_in_box(title, text)
+            console.print()
 
 
-def mux_failure(output_file: str) -> None:
+def mux_failure(output_file: str, events: list[dict] | None = None) -> None:
     """
     Process the muxing outpt file and display the reasons why the mux failed.
 
     Args:
         output_file (str): The path to the file where output of the mux is stored.
+        events (list[dict] | None): Task events reported by gradle; None to read the failures from the output file.
 
     Returns:
         None: Prints out the formatted mux output.
     """
 
-    failure_patterns = [
-        r"(FAILURE: .*)",
-        r"(.*What went wrong.*)",
-        r"(A problem occurred.*)",
-        r"(Execution failed for task.*)",
-        r"(Error resolving.*)",
-        r"(.*not found in root project.*)",
-        r"(style already exists.*)",
-        r"(one or more fatal font-related issues encountered.*)",
-        r"(FileNotFoundException.*)",
-        r"(mkvmerge -J command failed.*)",
-        r"(mkvmerge -J command timed out for file.*)",
-        r"(malformed property.*)",
-        r"(mkvmerge failed:.*)",
-        r"(Error: .*)",
-        r"(is ambiguous in root project.*)",
-        r"(.*could not find target sync line.*)",
-        r"(could not find property file.*)",
-        r"(Could not create task.*)",
-        r"(no chapter definitions found;.*)",
-        r"(Negative time after shifting line from.*)",
-        r"(Could not resolve.*)",
-        r"(Could not list available versions.*)",
-        r"(duplicate target sync lines with value.*)",
-        r"(could not post to webhook:.*)",
-        r"(Unexpected CRC for.*)",
-        r"(not a valid CRC:.*)",
-        r"(malformed line in.*)",
-        r"(Recursive property dependency detected:.*)",
-        r"(Attempting to access unfinished task.*)",
-        r"(Attempted to access entry.*)",
-        r"(more than one file added, but no root set, or conflicting roots..*)",
-        r"(couldn't upload torrent:.*)",
-        r"(request failed:.*)",
-        r"(could not upload.*)",
-        r"(can't convert type to destination directory:.*)",
-        r"(Invalid SSL Session.*)",
-        r"(Could not create directory:.*)",
-        r"(ssh command failed.*)",
-        r"(no conversion available from String to.*)",
-        r"(Invalid value for Collisions:.*)",
-        r"(too few fields in section.*)",
-        r"(could not parse.*)",
-        r"(no match for property name.*)",
-        r"(not a valid time:.*)",
-        r"(not a valid color:.*)",
-        r"(not a valid boolean:.*)",
-        r"(not a valid boolean:.*)",
-        r"(BUILD FAILED.*)",
-    ]
-
-    with open(output_file, "r") as f:
-        lines = f.read()
+    with timings.phase("parse"):
+        failures, compilation_errors = parse_failures(output_file, events)
 
-    for pattern in failure_patterns:
-        matches = re.finditer(pattern, lines)
-        for match in matches:
-            console.print(match.group(1))
+    with timings.phase("render"):
+        for failure in failures:
+            console.print(failure, markup=False)
             console.print()
 
-    line_list = lines.splitlines()
-    # Print subkt compilaton errors
-    start_line = "Script compilation errors:"
-    end_line = r"^\d+ errors$"
+        if compilation_errors:
+            msg_in_box("Script compilaton errors", "\n".join(compilation_errors))
 
-    start_index = -1
-    end_index = -1
 
-    if start_line in line_list:
-        start_index = line_list.index(start_line)
+def verify_output(ctx: click.Context, output_file: str) -> None:
+    """
+    Verify the files that were muxed using the output file.
 
-    for i, line in enumerate(line_list):
-        if re.match(end_line, line):
-            end_index = i
-            break
+    Args:
+        ctx (click.Context): Context passed by click from the entry point.
+        output_file (str): The path to the file where output of the mux is stored.
 
-    if start_index != -1 and end_index != -1 and start_index < end_index:
-        msg_in_box(
-            "Script compilaton errors",
-            "\n".join(line_list[start_index + 1 : end_index + 1]),
-        )
+    Returns:
+        None
+    """
+
+    files, tracks = get_mux_results(output_file, os.getcwd())
+    if not files:
+        return
+
+    with console.status("[cyan]Verifying muxed files[/cyan]"), timings.phase("verify"):
+        results = verify_files(files, ctx.obj["verify_cache"], len(files), tracks)
+    show_verify_results(results)
 
 
 def cat_output(ctx: click.Context) -> None:
@@ -408,10 +943,11 @@ def cat_output(ctx: click.Context) -> None:
 
     try:
         with open(output_file, "r") as f:
-            content = f.read()
+            console.print("[bold cyan]Output File Content:[/bold cyan]")
+            # Logs of debug runs can be huge so they are not read all at once.
+            for line in f:
+                click.echo(line, nl=False)
 
-        console.print("[bold cyan]Output File Content:[/bold cyan]")
-        click.echo(content)
         sys.exit(0)
     except FileNotFoundError:
         exit_with_msg(f"File not found: {output_file}")
@@ -423,6 +959,8 @@ def get_project_info(
     ctx: click.Context,
     project: str | None,
     episode: tuple,
+    arcs: tuple = (),
+    all_arcs: bool = False,
 ) -> tuple[str, str, list[str]]:
     """
     Gets the info about the project.
@@ -430,6 +968,8 @@ def get_project_info(
     Args:
         project (str | None): Project argument given by user; None if no argument provided.
         episode (tuple): Tuple of episodes that user provided as an argument; empty if no argument provided.
+        arcs (tuple): Arcs with their episodes given by user, like 's2:1-6,9'; empty to select them.
+        all_arcs (bool): Mux all the arcs of a project with alternate folder structure.
 
     Returns:
         project_name (str): Name of the project either from history or from config
@@ -446,6 +986,11 @@ def get_project_info(
     if episode:
         episode = [f"{ep:02}" for ep in sorted(episode)]
 
+    if not alternate_folder and (arcs or all_arcs):
+        exit_with_msg(
+            f"--arc and --all-arcs need a project with alternate folder structure; '{project_name}' does not have it."
+        )
+
     if episode and not alternate_folder:
         return project_name, path, episode
 
@@ -456,22 +1001,108 @@ def get_project_info(
             select_folder(path, "Select single or multiple episode: ", True),
         )
 
+    # Episodes of every arc; None if they are to be selected or taken from the folder.
+    if all_arcs:
+        selected = {arc: None for arc in list_folders(path)}
+    elif arcs:
+        selected = {}
+        for spec in arcs:
+            name, _, ranges = spec.partition(":")
+            arc = find_arc(config, project_name, path, name)
+            episodes = (
+                [f"{ep:02}" for ep in parse_episode_ranges(ranges)] if ranges else None
+            )
+            selected[arc] = episodes
     else:
-        arc = select_folder(path, "Select an arc/season: ", False)
-        console.print(arc)
-        if not episode:
-            episode = select_folder(
+        selected = {
+            arc: None
+            for arc in select_folder(path, "Select one or more arcs/seasons: ", True)
+        }
+        console.print(", ".join(selected))
+
+    tasks = []
+    for arc, episodes in selected.items():
+        episodes = episodes or episode
+        if not episodes and (all_arcs or arcs):
+            episodes = list_folders(os.path.join(path, arc))
+        elif not episodes:
+            episodes = select_folder(
                 os.path.join(path, arc),
-                "Select single or multiple episode: ",
+                f"Select single or multiple episode of {arc}: ",
                 True,
             )
-        arc = arc[3:].replace(" ", "").lower()
 
-        exceptions_section = f"{project_name}_exceptions"
-        if config.has_option(exceptions_section, arc):
-            arc = config.get(exceptions_section, arc)
+        name = arc_name(config, project_name, arc)
+        tasks.extend(f"{name}_{ep}" for ep in episodes)
+
+    return project_name, path, tasks
+
+
+def list_folders(path: str) -> list[str]:
+    """
+    List the folders within the given path that start with a number.
+
+    Args:
+        path (str): The directory path to search for folders.
+
+    Returns:
+        list[str]: Names of the folders in order.
+    """
+
+    return sorted(
+        folder
+        for folder in os.listdir(path)
+        if os.path.isdir(os.path.join(path, folder)) and folder[0].isdigit()
+    )
+
+
+def find_arc(
+    config: configparser.ConfigParser, project_name: str, path: str, name: str
+) -> str:
+    """
+    Find the folder of an arc from its folder name or its name in the mux tasks.
+
+    Args:
+        config (configparser.ConfigParser): The config.
+        project_name (str): Name of the project.
+        path (str): Path of the project.
+        name (str): Folder of the arc (e.g. '02 S2') or its name in the mux tasks (e.g. 's2').
+
+    Returns:
+        str: Folder of the arc. Exits the program if no arc has that name.
+    """
+
+    folders = list_folders(path)
+    for folder in folders:
+        if name in (folder, arc_name(config, project_name, folder)):
+            return folder
 
-        return project_name, path, [arc + "_" + str(ep) for ep in episode]
+    names = ", ".join(arc_name(config, project_name, folder) for folder in folders)
+    exit_with_msg(f"No arc named '{name}' in '{project_name}'. Arcs are: {names}")
+
+
+def parse_episode_ranges(ranges: str) -> list[int]:
+    """
+    Parse episodes given as numbers and ranges like '1-6,9'.
+
+    Args:
+        ranges (str): Numbers and ranges separated by commas.
+
+    Returns:
+        list[int]: The episodes in order without duplicates.
+    """
+
+    episodes = set()
+    for part in ranges.split(","):
+        start, _, end = part.strip().partition("-")
+        try:
+            episodes.update(range(int(start), int(end or start) + 1))
+        except ValueError:
+            raise click.BadParameter(
+                f"'{ranges}' is not a list of episodes like '1-6,9'.",
+                param_hint="'--arc'",
+            )
+    return sorted(episodes)
 
 
 def select_folder(
@@ -491,12 +1122,7 @@ def select_folder(
         list or str: The selected folder(s). Returns a list if `multi` is True; otherwise, a single folder name.
     """
 
-    # Get a sorted list of directories in the given path that start with a digit
-    valid_folders = sorted(
-        folder
-        for folder in os.listdir(path)
-        if os.path.isdir(os.path.join(path, folder)) and folder[0].isdigit()
-    )
+    valid_folders = list_folders(path)
     selected_folders = fzf(valid_folders, prompt=prompt, choose_multiple=multi)
 
     if not selected_folders:
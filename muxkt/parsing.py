@@ -0,0 +1,325 @@
+import re
+from typing import Iterator
+
+# Logs are read this many bytes of lines at a time. Debug logs can be
+# hundreds of MiB.
+CHUNK_SIZE = 4 * 1024 * 1024
+
+# Script compilation errors longer than this are cut short.
+MAX_COMPILATION_ERROR_LINES = 500
+
+VALIDATING_FONTS = re.compile(r"[vV]alidating fonts for.*")
+WARNING = re.compile(r"[wW]arning: .*")
+WARNING_MESSAGE = re.compile(r"^.*[wW]arning: (.*).*$")
+
+FAILURE_PATTERNS = [
+    r"(FAILURE: .*)",
+    r"(.*What went wrong.*)",
+    r"(A problem occurred.*)",
+    r"(Execution failed for task.*)",
+    r"(Error resolving.*)",
+    r"(.*not found in root project.*)",
+    r"(style already exists.*)",
+    r"(one or more fatal font-related issues encountered.*)",
+    r"(FileNotFoundException.*)",
+    r"(mkvmerge -J command failed.*)",
+    r"(mkvmerge -J command timed out for file.*)",
+    r"(malformed property.*)",
+    r"(mkvmerge failed:.*)",
+    r"(Error: .*)",
+    r"(is ambiguous in root project.*)",
+    r"(.*could not find target sync line.*)",
+    r"(could not find property file.*)",
+    r"(Could not create task.*)",
+    r"(no chapter definitions found;.*)",
+    r"(Negative time after shifting line from.*)",
+    r"(Could not resolve.*)",
+    r"(Could not list available versions.*)",
+    r"(duplicate target sync lines with value.*)",
+    r"(could not post to webhook:.*)",
+    r"(Unexpected CRC for.*)",
+    r"(not a valid CRC:.*)",
+    r"(malformed line in.*)",
+    r"(Recursive property dependency detected:.*)",
+    r"(Attempting to access unfinished task.*)",
+    r"(Attempted to access entry.*)",
+    r"(more than one file added, but no root set, or conflicting roots..*)",
+    r"(couldn't upload torrent:.*)",
+    r"(request failed:.*)",
+    r"(could not upload.*)",
+    r"(can't convert type to destination directory:.*)",
+    r"(Invalid SSL Session.*)",
+    r"(Could not create directory:.*)",
+    r"(ssh command failed.*)",
+    r"(no conversion available from String to.*)",
+    r"(Invalid value for Collisions:.*)",
+    r"(too few fields in section.*)",
+    r"(could not parse.*)",
+    r"(no match for property name.*)",
+    r"(not a valid time:.*)",
+    r"(not a valid color:.*)",
+    r"(not a valid boolean:.*)",
+    r"(not a valid boolean:.*)",
+    r"(BUILD FAILED.*)",
+]
+
+# Failures that may not happen again if the same mux is run again.
+TRANSIENT_FAILURE_PATTERNS = [
+    r"(mkvmerge -J command timed out for file.*)",
+    r"(request failed:.*)",
+    r"(Invalid SSL Session.*)",
+    r"(could not post to webhook:.*)",
+    r"(couldn't upload torrent:.*)",
+]
+
+# Failures that gradle reports for every kind of error.
+GENERIC_FAILURE_PATTERNS = [
+    r"(FAILURE: .*)",
+    r"(.*What went wrong.*)",
+    r"(A problem occurred.*)",
+    r"(Execution failed for task.*)",
+    r"(Error: .*)",
+    r"(BUILD FAILED.*)",
+]
+
+# Lines of the output of a successful mux that belong to each section of the
+# result. Sections without a header are printed as they are.
+SUCCESS_PATTERNS = [
+    (r"> Task :([^S].*)", "TASKS PERFORMED:"),
+    (r"(CHAPTER.*)", "CHAPTERS GENERATED:"),
+    (r"(Track.*])", "TRACK LIST:"),
+    (r"Attaching (.*[otOT][tT][fF])", "FONTS ATTACHED:"),
+    (r"(Validating fonts.*|warning: .*)", "WARNINGS:"),
+    (r"Attaching (.*[otOT][tT][fF])", "DUPLICATE FONTS ATTACHED:"),
+    (r"Output: (.*mkv)", "OUTPUT:"),
+    (r"(\d+ actionable tasks:.*)", ""),
+    (r"(BUILD SUCCESSFUL in .*s)", ""),
+]
+
+
+def parse_success(
+    output_file: str, events: list[dict] | None = None
+) -> tuple[list[tuple[str, list]], list[dict]]:
+    """
+    Sort the output of a successful mux into the sections of the result.
+
+    Args:
+        output_file (str): The path to the file where output of the mux is stored.
+        events (list[dict] | None): Task events reported by gradle; None to read the tasks from the output file.
+
+    Returns:
+        list[tuple[str, list]]: Header of every section and the lines that belong to it. The outputs are absolute paths when gradle reported them.
+        list[dict]: Events of the tasks that finished; empty if gradle did not report them.
+
+    Raises:
+        FileNotFoundError: If the output file does not exist.
+    """
+
+    with open(output_file, "r") as f:
+        lines = f.read()
+
+    # Gradle reports the tasks and their outputs itself when the init
+    # script ran, so those need not be searched for in the output.
+    from_events = {}
+    tasks = [event for event in events or [] if event["type"] == "finish"]
+    if tasks:
+        from_events["TASKS PERFORMED:"] = tasks
+        outputs = [
+            path
+            for task in tasks
+            for path in task.get("outputs", [])
+            if path.endswith(".mkv")
+        ]
+        if outputs:
+            from_events["OUTPUT:"] = outputs
+
+    sections = [
+        (
+            header,
+            from_events.get(header)
+            or [match.group(1) for match in re.finditer(pattern, lines)],
+        )
+        for pattern, header in SUCCESS_PATTERNS
+    ]
+    return sections, tasks
+
+
+def read_chunks(output_file: str) -> Iterator[list[str]]:
+    """
+    Read a log a few MiB of whole lines at a time so that large logs are
+    never in memory at once.
+
+    Args:
+        output_file (str): The path to the file where output of the mux is stored.
+
+    Yields:
+        list[str]: The next lines of the log.
+
+    Raises:
+        FileNotFoundError: If the output file does not exist.
+    """
+
+    with open(output_file, "r", errors="replace") as f:
+        while lines := f.readlines(CHUNK_SIZE):
+            yield lines
+
+
+def find_all(output_file: str, patterns: list[str]) -> dict[str, list[str]]:
+    """
+    Find every match of the patterns in a log in a single pass. None of the
+    patterns match across lines so the log can be searched in chunks of lines.
+
+    Args:
+        output_file (str): The path to the file where output of the mux is stored.
+        patterns (list[str]): Patterns with one group each.
+
+    Returns:
+        dict[str, list[str]]: The group of every match keyed by pattern, in the order they are in the log.
+
+    Raises:
+        FileNotFoundError: If the output file does not exist.
+    """
+
+    compiled = {pattern: re.compile(pattern) for pattern in patterns}
+    matches = {pattern: [] for pattern in patterns}
+    for lines in read_chunks(output_file):
+        chunk = "".join(lines)
+        for pattern, regex in compiled.items():
+            matches[pattern].extend(match.group(1) for match in regex.finditer(chunk))
+    return matches
+
+
+def parse_warnings(output_file: str) -> list[list[str]]:
+    """
+    Find the warnings in the output of a mux grouped by the subtitle they are for.
+
+    Args:
+        output_file (str): The path to the file where output of the mux is stored.
+
+    Returns:
+        list[list[str]]: Title of every group followed by its warnings.
+
+    Raises:
+        FileNotFoundError: If the output file does not exist.
+    """
+
+    # Try to group warnings for each subtitle separately
+    grouped = []
+    current_group = []
+    with open(output_file, "r", errors="replace") as f:
+        for line in f:
+            if VALIDATING_FONTS.search(line):
+                if current_group:
+                    grouped.append(current_group)
+                current_group = [line.strip()[:-3]]
+            elif WARNING.search(line):
+                warning = WARNING_MESSAGE.sub(r"\1", line)
+                if current_group:
+                    current_group.append(warning.strip())
+
+    if current_group:
+        grouped.append(current_group)
+
+    return grouped
+
+
+def parse_failures(
+    output_file: str, events: list[dict] | None = None
+) -> tuple[list[str], list[str]]:
+    """
+    Find the reasons why a mux failed.
+
+    Args:
+        output_file (str): The path to the file where output of the mux is stored.
+        events (list[dict] | None): Task events reported by gradle; None to read the failures from the output file.
+
+    Returns:
+        list[str]: The failures.
+        list[str]: Lines of the script compilation errors; empty if there were none.
+    """
+
+    failures = []
+    for event in events or []:
+        for message in event.get("failure", []):
+            if message not in failures:
+                failures.append(message)
+    if failures:
+        return failures, []
+
+    # Same order as if every pattern was searched in the whole log one after another.
+    matches = {pattern: [] for pattern in FAILURE_PATTERNS}
+    compiled = {pattern: re.compile(pattern) for pattern in matches}
+
+    # Find subkt compilaton errors
+    start_line = "Script compilation errors:"
+    end_line = re.compile(r"^\d+ errors$")
+    errors = []
+    dropped = 0
+    state = "before"
+
+    for lines in read_chunks(output_file):
+        chunk = "".join(lines)
+        for pattern, regex in compiled.items():
+            matches[pattern].extend(match.group(1) for match in regex.finditer(chunk))
+
+        if state == "done":
+            continue
+
+        for line in lines:
+            line = line.rstrip("\n")
+            if state == "before":
+                if line == start_line:
+                    state = "inside"
+                elif line[:1].isdigit() and end_line.match(line):
+                    # The errors are only shown when the count comes after them.
+                    state = "done"
+                    break
+            else:
+                if len(errors) < MAX_COMPILATION_ERROR_LINES:
+                    errors.append(line)
+                else:
+                    dropped += 1
+                if line[:1].isdigit() and end_line.match(line):
+                    state = "done"
+                    break
+
+    failures = [failure for pattern in FAILURE_PATTERNS for failure in matches[pattern]]
+
+    if state != "done" or not errors:
+        return failures, []
+    if dropped:
+        errors.append(f"... {dropped} more lines in the log")
+    return failures, errors
+
+
+def find_transient_failures(output_file: str) -> list[str]:
+    """
+    Find the transient errors because of which the mux failed.
+
+    Args:
+        output_file (str): The path to the file where output of the mux is stored.
+
+    Returns:
+        list[str]: The transient errors; empty if there were none or if the mux also failed because of other errors.
+    """
+
+    permanent = [
+        pattern
+        for pattern in FAILURE_PATTERNS
+        if pattern not in TRANSIENT_FAILURE_PATTERNS
+        and pattern not in GENERIC_FAILURE_PATTERNS
+    ]
+
+    try:
+        matches = find_all(output_file, permanent + TRANSIENT_FAILURE_PATTERNS)
+    except FileNotFoundError:
+        return []
+
+    if any(matches[pattern] for pattern in permanent):
+        return []
+
+    return [
+        failure
+        for pattern in TRANSIENT_FAILURE_PATTERNS
+        for failure in matches[pattern]
+    ]
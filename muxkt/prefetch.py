@@ -0,0 +1,208 @@
+import os
+import queue
+import re
+import threading
+
+from .scheduler import read_meminfo
+
+# Files smaller than this are cheap to read cold and are not prefetched.
+MIN_FILE_SIZE = 64 * 1024 * 1024
+
+CHUNK_SIZE = 1024 * 1024
+
+MEDIA_EXTENSIONS = (".mkv", ".mp4", ".m2ts", ".ts", ".avi", ".webm", ".flac", ".wav")
+
+
+def find_input_files(path: str, ep: str, log_dir: str, project: str) -> list[str]:
+    """
+    Find the large files that the mux of an episode will read. These are the
+    files in the track list of the last mux of the episode and the media
+    files in the folder of the episode.
+
+    Args:
+        path (str): Path of the project.
+        ep (str): Episode that will be muxed.
+        log_dir (str): Directory where the logs are archived.
+        project (str): Name of the project.
+
+    Returns:
+        list[str]: Paths of the files.
+    """
+
+    files = []
+
+    project_logs = os.path.join(log_dir, project)
+    try:
+        logs = sorted(
+            name for name in os.listdir(project_logs) if name.endswith(f"_{ep}.txt")
+        )
+    except OSError:
+        logs = []
+
+    if logs:
+        with open(os.path.join(project_logs, logs[-1]), "r", errors="replace") as f:
+            for line in f:
+                match = re.search(r"Track \w+ \(.*?\) \[(.*?)\]$", line.rstrip("\n"))
+                if match:
+                    files.append(os.path.join(path, match.group(1)))
+
+    folder = os.path.join(path, ep)
+    if os.path.isdir(folder):
+        with os.scandir(folder) as entries:
+            files.extend(
+                entry.path
+                for entry in entries
+                if entry.is_file() and entry.name.lower().endswith(MEDIA_EXTENSIONS)
+            )
+
+    large_files = []
+    for file in dict.fromkeys(files):
+        try:
+            if os.path.getsize(file) >= MIN_FILE_SIZE:
+                large_files.append(file)
+        except OSError:
+            continue
+    return large_files
+
+
+class Prefetcher:
+    """
+    Reads the input files of the next episode in the background so that they
+    are in the page cache when its mux starts.
+    """
+
+    def __init__(self, budget: int, path: str, log_dir: str, project: str) -> None:
+        self.budget = budget
+        self.path = path
+        self.log_dir = log_dir
+        self.project = project
+        self.jobs = queue.Queue()
+        self.lock = threading.Lock()
+        self.queued = set()
+        self.cancelled = set()
+        self.total = {}
+        self.done = {}
+        self.prefetched = 0
+        self.hits = []
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def prefetch(self, ep: str) -> None:
+        """
+        Queue the input files of an episode to be prefetched. They are looked
+        up on the prefetch thread as that reads the last log of the episode.
+
+        Args:
+            ep (str): Episode that will be muxed.
+
+        Returns:
+            None
+        """
+
+        with self.lock:
+            if ep in self.queued:
+                return
+            self.queued.add(ep)
+            self.done[ep] = 0
+
+        self.jobs.put(ep)
+
+    def sizes(self, files: list[str]) -> dict[str, int]:
+        """
+        Decide how much of every file to prefetch within the budget.
+
+        Args:
+            files (list[str]): Paths of the files.
+
+        Returns:
+            dict[str, int]: Bytes to prefetch keyed by path of the file.
+        """
+
+        budget = self.budget
+        available = read_meminfo("MemAvailable")
+        if available is not None:
+            # Leave half of the free memory to the muxes themselves.
+            budget = min(budget, available // 2)
+
+        sizes = {}
+        for file in files:
+            try:
+                size = min(os.path.getsize(file), budget)
+            except OSError:
+                continue
+            if size > 0:
+                sizes[file] = size
+                budget -= size
+        return sizes
+
+    def started(self, ep: str) -> None:
+        """
+        Stop prefetching the episode as its mux has started and record how
+        much of it was prefetched in time.
+
+        Args:
+            ep (str): Episode whose mux started.
+
+        Returns:
+            None
+        """
+
+        with self.lock:
+            self.cancelled.add(ep)
+            # Episodes whose files are not looked up yet are recorded by run.
+            if self.total.get(ep):
+                self.hits.append(min(1.0, self.done[ep] / self.total[ep]))
+
+    def hit_rate(self) -> float | None:
+        """Average fraction of the input of an episode that was prefetched before its mux started."""
+
+        return sum(self.hits) / len(self.hits) if self.hits else None
+
+    def close(self) -> None:
+        """Stop prefetching."""
+
+        self.jobs.put(None)
+
+    def run(self) -> None:
+        while (ep := self.jobs.get()) is not None:
+            files = find_input_files(self.path, ep, self.log_dir, self.project)
+            sizes = self.sizes(files)
+            with self.lock:
+                self.total[ep] = sum(sizes.values())
+                if ep in self.cancelled:
+                    # The mux started before any of its input was read.
+                    if self.total[ep]:
+                        self.hits.append(0.0)
+                    continue
+
+            for file, size in sizes.items():
+                if ep in self.cancelled:
+                    break
+                self.read(ep, file, size)
+
+    def read(self, ep: str, file: str, size: int) -> int:
+        """
+        Read the start of a file into the page cache.
+
+        Returns:
+            int: Number of bytes read.
+        """
+
+        read = 0
+        try:
+            with open(file, "rb", buffering=0) as f:
+                if hasattr(os, "posix_fadvise"):
+                    os.posix_fadvise(f.fileno(), 0, size, os.POSIX_FADV_WILLNEED)
+
+                buffer = bytearray(CHUNK_SIZE)
+                while read < size and ep not in self.cancelled:
+                    chunk = f.readinto(buffer)
+                    if not chunk:
+                        break
+                    read += chunk
+                    with self.lock:
+                        self.done[ep] += chunk
+                        self.prefetched += chunk
+        except OSError:
+            pass
+        return read
@@ -0,0 +1,196 @@
+import difflib
+import itertools
+import json
+import os
+import re
+
+# Properties of sub.properties whose entries become 'mux.<entry>' tasks.
+TASK_PROPERTIES = ["episodes", "batches"]
+
+
+def parse_properties(path: str) -> dict[str, dict[str, str]]:
+    """
+    Parse a SubKt property file.
+
+    Args:
+        path (str): Path of the property file.
+
+    Returns:
+        dict[str, dict[str, str]]: Properties of every section keyed by the name of the section; properties before any section are under "".
+    """
+
+    sections = {"": {}}
+    current = sections[""]
+
+    with open(path, "r", encoding="utf-8") as f:
+        lines = iter(f.read().splitlines())
+
+    for line in lines:
+        line = line.strip()
+        # Lines ending with a backslash continue on the next line.
+        while line.endswith("\\"):
+            line = line[:-1] + next(lines, "").strip()
+
+        if not line or line.startswith(("#", "!")):
+            continue
+
+        section = re.fullmatch(r"\[(.+)\]", line)
+        if section:
+            current = sections.setdefault(section.group(1).strip(), {})
+            continue
+
+        key, sep, value = line.partition("=")
+        if sep:
+            current[key.strip()] = value.strip()
+
+    return sections
+
+
+def gradle_settings(path: str, keys: list[str]) -> dict[str, tuple[str, str]]:
+    """
+    Read settings from gradle.properties. The gradle.properties in the gradle
+    user home wins over the one in the project like it does in gradle.
+
+    Args:
+        path (str): Path of the project.
+        keys (list[str]): Names of the settings to read.
+
+    Returns:
+        dict[str, tuple[str, str]]: Value and the file it came from of every setting that is set.
+    """
+
+    user_home = os.environ.get("GRADLE_USER_HOME") or os.path.join(
+        os.path.expanduser("~"), ".gradle"
+    )
+
+    settings = {}
+    for properties_file in [
+        os.path.join(path, "gradle.properties"),
+        os.path.join(user_home, "gradle.properties"),
+    ]:
+        try:
+            properties = parse_properties(properties_file)[""]
+        except OSError:
+            continue
+        for key in keys:
+            if key in properties:
+                settings[key] = (properties[key], properties_file)
+    return settings
+
+
+def expand_braces(value: str) -> list[str]:
+    """
+    Expand the ranges and alternatives in a property value the way SubKt does.
+    (e.g. 's1_{01..03}|12.5' gives 's1_01', 's1_02', 's1_03' and '12.5'.)
+
+    Args:
+        value (str): Value of the property.
+
+    Returns:
+        list[str]: Expanded values.
+    """
+
+    expanded = []
+    for item in value.split("|"):
+        parts = re.split(r"(\{[^{}]*\})", item.strip())
+        choices = []
+        for part in parts:
+            brace = re.fullmatch(r"\{(\w+)\.\.(\w+)\}", part)
+            if brace and brace.group(1).isdigit() and brace.group(2).isdigit():
+                start, end = brace.groups()
+                width = len(start) if start.startswith("0") else 0
+                choices.append(
+                    [f"{i:0{width}}" for i in range(int(start), int(end) + 1)]
+                )
+            elif part.startswith("{") and part.endswith("}"):
+                choices.append(part[1:-1].split(","))
+            else:
+                choices.append([part])
+        expanded.extend("".join(product) for product in itertools.product(*choices))
+
+    return [entry for entry in expanded if entry]
+
+
+def get_mux_entries(path: str, cache_file: str) -> list[str] | None:
+    """
+    Get the episodes and batches that the project can mux from its sub.properties.
+
+    Args:
+        path (str): Path of the project.
+        cache_file (str): Path of the file where parsed entries are cached by modified time.
+
+    Returns:
+        list[str] | None: Entries that 'mux.<entry>' tasks exist for; None if they could not be found out.
+    """
+
+    properties_file = os.path.abspath(os.path.join(path, "sub.properties"))
+    try:
+        mtime = os.stat(properties_file).st_mtime_ns
+    except OSError:
+        return None
+
+    try:
+        with open(cache_file, "r") as f:
+            cache = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        cache = {}
+
+    cached = cache.get(properties_file)
+    if cached and cached["mtime_ns"] == mtime:
+        return cached["entries"]
+
+    try:
+        properties = parse_properties(properties_file)[""]
+    except (OSError, UnicodeDecodeError):
+        return None
+
+    entries = []
+    for name in TASK_PROPERTIES:
+        value = properties.get(name)
+        if value is None:
+            continue
+        # Values built from other properties can only be resolved by SubKt.
+        if "$" in value:
+            entries = None
+            break
+        entries.extend(expand_braces(value))
+
+    if not entries:
+        entries = None
+
+    cache[properties_file] = {"mtime_ns": mtime, "entries": entries}
+    with open(cache_file, "w") as f:
+        json.dump(cache, f)
+
+    return entries
+
+
+def find_invalid_tasks(names: list[str], entries: list[str]) -> dict[str, list[str]]:
+    """
+    Find the names that would make gradle fail to find the 'mux.<name>' task.
+
+    Gradle accepts a name that is the start of exactly one task, so those are valid too.
+
+    Args:
+        names (list[str]): Names of the entries to mux.
+        entries (list[str]): Entries that 'mux.<entry>' tasks exist for.
+
+    Returns:
+        dict[str, list[str]]: Invalid names with the closest valid names as suggestions.
+    """
+
+    valid = set(entries)
+    invalid = {}
+    for name in names:
+        if name in valid:
+            continue
+
+        candidates = [entry for entry in entries if entry.startswith(name)]
+        if len(candidates) == 1:
+            continue
+
+        invalid[name] = candidates[:5] or difflib.get_close_matches(
+            name, entries, n=3, cutoff=0.5
+        )
+
+    return invalid
@@ -0,0 +1,540 @@
+import os
+import select
+import subprocess
+import time
+from typing import TYPE_CHECKING, Callable, Iterator
+
+from .timings import timings
+
+if TYPE_CHECKING:
+    # Only exists on POSIX systems.
+    import resource
+
+# Memory a single SubKt mux (Gradle JVM + mkvmerge) is assumed to need at
+# least. Larger peaks that are observed replace it.
+DEFAULT_JOB_MEMORY = 1536 * 1024 * 1024
+
+# Memory that is always left free for the rest of the system.
+MEMORY_RESERVE = 512 * 1024 * 1024
+
+# Fraction of time a disk can be busy before new muxes are held back.
+DISK_BUSY_LIMIT = 0.9
+
+# Seconds to wait after a launch so the new job shows up in the measurements.
+LAUNCH_INTERVAL = 2.0
+
+POLL_INTERVAL = 0.5
+
+
+class Scheduler:
+    """
+    Decides when a new mux can be started from the memory, cpu and disk
+    pressure of the system and the memory used by the muxes that already ran.
+    """
+
+    def __init__(self, max_jobs: int) -> None:
+        self.max_jobs = max_jobs
+        self.peak_memory = 0
+        self.last_launch = 0.0
+        self.last_disk_sample = read_disk_ticks()
+
+    def job_memory(self) -> int:
+        """Memory that a mux is expected to use at its peak."""
+
+        # Gradle daemons are not in the process tree of a mux, so what is
+        # measured can be just the client and must not lower the default.
+        return max(self.peak_memory, DEFAULT_JOB_MEMORY)
+
+    def record_memory(self, rss: int) -> None:
+        """Record the memory used by the process tree of a mux."""
+
+        self.peak_memory = max(self.peak_memory, rss)
+
+    def disk_busy(self) -> float | None:
+        """
+        Fraction of time the busiest disk was busy since the last call.
+
+        Returns:
+            float | None: Between 0 and 1; None if it could not be measured.
+        """
+
+        sample = read_disk_ticks()
+        previous, self.last_disk_sample = self.last_disk_sample, sample
+        if not sample or not previous:
+            return None
+
+        elapsed = (sample[0] - previous[0]) * 1000
+        if elapsed <= 0:
+            return None
+
+        busy = [
+            ticks - previous[1][disk]
+            for disk, ticks in sample[1].items()
+            if disk in previous[1]
+        ]
+        return max(busy, default=0) / elapsed
+
+    def can_launch(self, running_rss: list[int]) -> bool:
+        """
+        Check if another mux can be started.
+
+        Args:
+            running_rss (list[int]): Memory currently used by each running mux.
+
+        Returns:
+            bool: True if a new mux can be started; otherwise False.
+        """
+
+        if not running_rss:
+            return True
+
+        if len(running_rss) >= self.max_jobs:
+            return False
+
+        if time.monotonic() - self.last_launch < LAUNCH_INTERVAL:
+            return False
+
+        available = read_meminfo("MemAvailable")
+        if available is not None:
+            # Running muxes may not have reached their peak yet.
+            job_memory = self.job_memory()
+            growth = sum(max(0, job_memory - rss) for rss in running_rss)
+            if available - growth - job_memory < MEMORY_RESERVE:
+                return False
+
+        load = read_loadavg()
+        if load is not None and load >= (os.cpu_count() or 1):
+            return False
+
+        busy = self.disk_busy()
+        if busy is not None and busy >= DISK_BUSY_LIMIT:
+            return False
+
+        return True
+
+    def launched(self) -> None:
+        """Record that a new mux was started."""
+
+        self.last_launch = time.monotonic()
+
+
+def resolve_jobs(jobs: str) -> int:
+    """
+    Get the maximum number of muxes that can run at the same time.
+
+    Args:
+        jobs (str): Value of the jobs option; either 'auto' or a number.
+
+    Returns:
+        int: Maximum number of muxes that can run at the same time.
+    """
+
+    if jobs != "auto":
+        return int(jobs)
+
+    # Without /proc there is no way to see the pressure on the system.
+    if read_meminfo("MemAvailable") is None:
+        return 1
+
+    return max(1, (os.cpu_count() or 1) // 2)
+
+
+def run_commands(
+    commands: list[tuple[str, list[str], str]],
+    scheduler: Scheduler,
+    on_change: Callable[[list[str]], None] | None = None,
+    retry_delay: Callable[[str, int, int], float | None] | None = None,
+    cwd: str | None = None,
+) -> Iterator[dict]:
+    """
+    Run the commands as many at a time as the scheduler allows.
+
+    Args:
+        commands (list[tuple[str, list[str], str]]): Name, command and the file to store the output of each command.
+        scheduler (Scheduler): Scheduler that decides when a command can be started.
+        on_change (Callable[[list[str]], None] | None): Called with the names of running commands whenever it changes.
+        retry_delay (Callable[[str, int, int], float | None] | None): Called with the name, return code and attempts of a failed command. Returns seconds to wait before running it again; None to not run it again.
+        cwd (str | None): Directory to run the commands in; None for the current directory.
+
+    Yields:
+        dict: Name, return code, number of retries, duration and resource usage of each command in the same order as the commands.
+    """
+
+    commands_by_name = {name: (command, output) for name, command, output in commands}
+    pending = list(commands_by_name)
+    not_before = {}
+    attempts = dict.fromkeys(commands_by_name, 0)
+    running = {}
+    usages = {}
+    finished = {}
+    order = list(commands_by_name)
+
+    try:
+        while order:
+            running_rss = [
+                usages[name].sample(proc.pid) for name, (proc, _, _) in running.items()
+            ]
+            for rss in running_rss:
+                scheduler.record_memory(rss)
+
+            changed = False
+            while True:
+                now = time.monotonic()
+                ready = [name for name in pending if not_before.get(name, 0) <= now]
+                if not ready or not scheduler.can_launch(running_rss):
+                    break
+
+                name = ready[0]
+                pending.remove(name)
+                command, output_file = commands_by_name[name]
+                f = open(output_file, "w")
+                proc = subprocess.Popen(command, stdout=f, stderr=f, text=True, cwd=cwd)
+                running[name] = (proc, f, time.perf_counter())
+                usages[name] = ResourceUsage()
+                attempts[name] += 1
+                running_rss.append(0)
+                scheduler.launched()
+                changed = True
+
+            for name, (proc, f, start) in list(running.items()):
+                exited, rusage = wait_process(proc)
+                if not exited:
+                    continue
+
+                end = time.perf_counter()
+                timings.record("gradle", start, end, episode=name)
+                f.close()
+                del running[name]
+                changed = True
+
+                delay = None
+                if proc.returncode != 0 and retry_delay:
+                    delay = retry_delay(name, proc.returncode, attempts[name])
+
+                if delay is None:
+                    finished[name] = {
+                        "name": name,
+                        "returncode": proc.returncode,
+                        "retries": attempts[name] - 1,
+                        "duration": end - start,
+                        "usage": usages[name].result(end - start, rusage),
+                    }
+                else:
+                    pending.insert(0, name)
+                    not_before[name] = time.monotonic() + delay
+
+            if changed and on_change:
+                on_change(list(running))
+
+            while order and order[0] in finished:
+                yield finished.pop(order.pop(0))
+
+            # Anything that finished or launched may let the next command
+            # start, so only wait when nothing happened.
+            if order and not changed:
+                wait_for_exit([proc for proc, _, _ in running.values()], POLL_INTERVAL)
+    finally:
+        for proc, f, _ in running.values():
+            proc.terminate()
+            proc.wait()
+            f.close()
+
+
+def read_meminfo(field: str) -> int | None:
+    """
+    Read a field from /proc/meminfo.
+
+    Args:
+        field (str): Name of the field (e.g. MemAvailable).
+
+    Returns:
+        int | None: Value of the field in bytes; None if it could not be read.
+    """
+
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if name == field:
+                    return int(value.split()[0]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def read_loadavg() -> float | None:
+    """
+    Read the load average of last minute from /proc/loadavg.
+
+    Returns:
+        float | None: Load average; None if it could not be read.
+    """
+
+    try:
+        with open("/proc/loadavg", "r") as f:
+            return float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def read_disk_ticks() -> tuple[float, dict[str, int]] | None:
+    """
+    Read the milliseconds each disk spent doing I/O from /proc/diskstats.
+
+    Returns:
+        tuple[float, dict[str, int]] | None: Time of the sample and the ticks of each disk; None if it could not be read.
+    """
+
+    ticks = {}
+    try:
+        with open("/proc/diskstats", "r") as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) < 13 or fields[2].startswith(("loop", "ram")):
+                    continue
+                ticks[fields[2]] = int(fields[12])
+    except (OSError, ValueError):
+        return None
+    return time.monotonic(), ticks
+
+
+def read_process_parents() -> dict[int, int] | None:
+    """
+    Read the parent of every process from /proc.
+
+    Returns:
+        dict[int, int] | None: Pid of the parent keyed by pid of the process; None if /proc could not be read.
+    """
+
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return None
+
+    parents = {}
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                # The name of the process is in brackets and may contain spaces.
+                parents[int(entry)] = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+    return parents
+
+
+def process_tree(pid: int, parents: dict[int, int] | None = None) -> list[int]:
+    """
+    Get the pid of the process and all of its descendants.
+
+    Args:
+        pid (int): Pid of the process.
+        parents (dict[int, int] | None): Result of read_process_parents; None to read it.
+
+    Returns:
+        list[int]: Pids of the process tree, parents before their children; only the given pid if /proc could not be read.
+    """
+
+    if parents is None:
+        parents = read_process_parents()
+        if parents is None:
+            return [pid]
+
+    children = {}
+    for child, parent in parents.items():
+        children.setdefault(parent, []).append(child)
+
+    tree = [pid]
+    for current in tree:
+        tree.extend(children.get(current, []))
+    return tree
+
+
+def read_process_rss(pid: int) -> int:
+    """
+    Get the memory used by a process.
+
+    Args:
+        pid (int): Pid of the process.
+
+    Returns:
+        int: Resident memory of the process in bytes; 0 if it could not be read.
+    """
+
+    try:
+        with open(f"/proc/{pid}/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def read_process_io(pid: int) -> tuple[int, int] | None:
+    """
+    Get the bytes a process read and wrote, including those served by the
+    page cache or going through pipes and those of its children that it has
+    waited for.
+
+    Args:
+        pid (int): Pid of the process.
+
+    Returns:
+        tuple[int, int] | None: Bytes read and bytes written; None if they could not be read.
+    """
+
+    counters = {}
+    try:
+        with open(f"/proc/{pid}/io", "r") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                counters[name] = int(value)
+    except (OSError, ValueError):
+        return None
+
+    if "rchar" not in counters or "wchar" not in counters:
+        return None
+    return counters["rchar"], counters["wchar"]
+
+
+def process_tree_rss(pid: int) -> int:
+    """
+    Get the memory used by the process and all of its descendants.
+
+    Args:
+        pid (int): Pid of the process.
+
+    Returns:
+        int: Resident memory of the process tree in bytes.
+    """
+
+    return sum(read_process_rss(child) for child in process_tree(pid))
+
+
+class ResourceUsage:
+    """
+    Resources used by the process tree of a command. Memory and I/O are
+    sampled from /proc while it runs; CPU time comes from the rusage that
+    wait4 returns when it exits. Processes outside the tree (like a gradle
+    daemon that was already running) are not counted.
+    """
+
+    def __init__(self) -> None:
+        self.peak_rss = 0
+        self.parents = {}
+        self.io = {}
+
+    def sample(self, pid: int) -> int:
+        """
+        Sample the memory and I/O of the process tree.
+
+        Args:
+            pid (int): Pid of the root of the tree.
+
+        Returns:
+            int: Resident memory of the process tree in bytes.
+        """
+
+        parents = read_process_parents()
+        tree = process_tree(pid, parents)
+
+        # A process that exited was waited for by its parent, whose counters
+        # now include its I/O.
+        for gone in set(self.io) - set(tree):
+            if self.parents.get(gone) in tree:
+                del self.io[gone]
+
+        rss = 0
+        for child in tree:
+            rss += read_process_rss(child)
+            io = read_process_io(child)
+            if io is not None:
+                self.io[child] = io
+                self.parents[child] = (parents or {}).get(child)
+
+        self.peak_rss = max(self.peak_rss, rss)
+        return rss
+
+    def result(self, wall: float, rusage: "resource.struct_rusage | None") -> dict:
+        """
+        Get the resources used by the command after it exited.
+
+        Args:
+            wall (float): Seconds the command ran.
+            rusage (resource.struct_rusage | None): Rusage from wait4; None if it is not available.
+
+        Returns:
+            dict: wall, user and system seconds, peak_rss, read and written bytes.
+        """
+
+        usage = {
+            "wall": wall,
+            "user": None,
+            "system": None,
+            "peak_rss": self.peak_rss,
+            "read": sum(read for read, _ in self.io.values()),
+            "written": sum(written for _, written in self.io.values()),
+        }
+        if rusage is not None:
+            usage["user"] = rusage.ru_utime
+            usage["system"] = rusage.ru_stime
+            # ru_maxrss is in KiB and is the peak of the largest single process.
+            usage["peak_rss"] = max(self.peak_rss, rusage.ru_maxrss * 1024)
+        return usage
+
+
+def wait_for_exit(procs: list[subprocess.Popen], timeout: float) -> None:
+    """
+    Wait until one of the processes exits or the timeout passes, whichever
+    comes first. Without pidfd support this always waits for the timeout.
+
+    Args:
+        procs (list[subprocess.Popen]): The processes.
+        timeout (float): Maximum seconds to wait.
+
+    Returns:
+        None
+    """
+
+    pidfds = []
+    try:
+        if hasattr(os, "pidfd_open"):
+            for proc in procs:
+                pidfds.append(os.pidfd_open(proc.pid))
+        if pidfds:
+            select.select(pidfds, [], [], timeout)
+            return
+    except OSError:
+        pass
+    finally:
+        for pidfd in pidfds:
+            os.close(pidfd)
+
+    time.sleep(timeout)
+
+
+def wait_process(
+    proc: subprocess.Popen,
+) -> tuple[bool, "resource.struct_rusage | None"]:
+    """
+    Check if a process exited without blocking, and get its rusage if it did.
+
+    Args:
+        proc (subprocess.Popen): The process.
+
+    Returns:
+        bool: True if the process exited; otherwise False.
+        resource.struct_rusage | None: Resources used by the process and the children it waited for; None if not available.
+    """
+
+    if not hasattr(os, "wait4") or proc.returncode is not None:
+        return proc.poll() is not None, None
+
+    try:
+        pid, status, rusage = os.wait4(proc.pid, os.WNOHANG)
+    except ChildProcessError:
+        return proc.poll() is not None, None
+    if pid == 0:
+        return False, None
+
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return True, rusage
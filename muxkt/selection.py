@@ -1,6 +1,6 @@
 from time import sleep
 
-from iterfzf import iterfzf
+from .timings import timings
 
 
 def selection(iterable: list):
@@ -32,4 +32,9 @@ def fzf(iterable: list, prompt: str, choose_multiple: bool = False):
         list | str: list of chosen items if 'choose_multiple' is true; string of chosen item otherwise
     """
 
-    return iterfzf(selection(iterable), prompt=prompt, multi=choose_multiple)
+    # Imported here so that muxkt can run without fzf when nothing is selected
+    # interactively (e.g. as a worker).
+    from iterfzf import iterfzf
+
+    with timings.phase("fzf selection"):
+        return iterfzf(selection(iterable), prompt=prompt, multi=choose_multiple)
@@ -0,0 +1,194 @@
+import os
+import queue
+import shutil
+import threading
+import time
+import zlib
+
+# zlib releases the GIL while hashing large buffers so hashing in big chunks
+# does not hold back the muxing.
+CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def staged_files(stage_dir: str, path: str) -> list[tuple[str, str]]:
+    """
+    List the files that a mux wrote to its staging folder and where they belong.
+
+    Args:
+        stage_dir (str): Staging folder of the episode.
+        path (str): Path of the project.
+
+    Returns:
+        list[tuple[str, str]]: Every staged file and its path in the project.
+    """
+
+    files = []
+    for root, _, names in os.walk(stage_dir):
+        for name in sorted(names):
+            staged = os.path.join(root, name)
+            files.append(
+                (staged, os.path.join(path, os.path.relpath(staged, stage_dir)))
+            )
+    return files
+
+
+def copy_with_crc(source: str, destination: str) -> int:
+    """
+    Copy a file and calculate the CRC32 of what was read.
+
+    Args:
+        source (str): File to copy.
+        destination (str): Where to copy it.
+
+    Returns:
+        int: CRC32 of the source.
+    """
+
+    crc = 0
+    buffer = bytearray(CHUNK_SIZE)
+    view = memoryview(buffer)
+    with open(source, "rb", buffering=0) as src, open(destination, "wb") as dst:
+        while size := src.readinto(buffer):
+            crc = zlib.crc32(view[:size], crc)
+            dst.write(view[:size])
+        dst.flush()
+        os.fsync(dst.fileno())
+    return crc
+
+
+def file_crc(path: str) -> int:
+    """
+    Calculate the CRC32 of a file.
+
+    Args:
+        path (str): Path of the file.
+
+    Returns:
+        int: CRC32 of the file.
+    """
+
+    crc = 0
+    buffer = bytearray(CHUNK_SIZE)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        # Read what is on the disk, not what is still in memory from writing it.
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+        while size := f.readinto(buffer):
+            crc = zlib.crc32(view[:size], crc)
+    return crc
+
+
+def remove_empty_folders(path: str) -> None:
+    """
+    Remove the folder and all the folders inside it that have no files.
+
+    Args:
+        path (str): The folder.
+
+    Returns:
+        None
+    """
+
+    for root, _, _ in os.walk(path, topdown=False):
+        try:
+            os.rmdir(root)
+        except OSError:
+            continue
+
+
+class Transfers:
+    """
+    Moves the files that were muxed to the staging folder to the project in
+    the background. Files on another filesystem are copied, checked against
+    the CRC32 of the staged file and only then removed from the staging folder.
+    """
+
+    def __init__(self) -> None:
+        self.jobs = queue.Queue()
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.max_depth = 0
+        self.transferred = 0
+        self.files = 0
+        self.busy_time = 0.0
+        self.failures = []
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def add(self, source: str, destination: str) -> None:
+        """
+        Queue a file to be moved.
+
+        Args:
+            source (str): The staged file.
+            destination (str): Its path in the project.
+
+        Returns:
+            None
+        """
+
+        with self.lock:
+            self.pending += 1
+            self.max_depth = max(self.max_depth, self.pending)
+        self.jobs.put((source, destination))
+
+    def wait(self) -> None:
+        """Wait for all the queued files to be moved."""
+
+        self.jobs.put(None)
+        self.thread.join()
+
+    def throughput(self) -> float | None:
+        """Bytes moved per second of transferring; None if nothing was moved."""
+
+        return self.transferred / self.busy_time if self.busy_time else None
+
+    def run(self) -> None:
+        while (job := self.jobs.get()) is not None:
+            source, destination = job
+            start = time.perf_counter()
+            try:
+                size = os.path.getsize(source)
+                self.move(source, destination)
+            except (OSError, ValueError) as e:
+                with self.lock:
+                    self.failures.append(f"{source}: {e}")
+            else:
+                with self.lock:
+                    self.transferred += size
+                    self.files += 1
+            finally:
+                with self.lock:
+                    self.pending -= 1
+                    self.busy_time += time.perf_counter() - start
+
+    def move(self, source: str, destination: str) -> None:
+        """
+        Move a file, copying and checking it if it is on another filesystem.
+
+        Raises:
+            OSError: If the file could not be moved.
+            ValueError: If the copy does not match the staged file.
+        """
+
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        try:
+            os.replace(source, destination)
+            return
+        except OSError:
+            pass
+
+        # Other programs never see a half copied file at the destination.
+        partial = destination + ".muxkt-part"
+        try:
+            crc = copy_with_crc(source, partial)
+            if file_crc(partial) != crc:
+                raise ValueError("Copy does not match the staged file.")
+            os.replace(partial, destination)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        shutil.copystat(source, destination)
+        os.remove(source)
@@ -0,0 +1,170 @@
+import json
+import os
+import re
+import subprocess
+
+from .properties import find_invalid_tasks, get_mux_entries
+
+
+def build_command(
+    custom_flag: tuple | list,
+    ep: str,
+    init_script: str | None = None,
+    events_file: str | None = None,
+) -> list[str]:
+    """
+    Build the gradle command that muxes the episode.
+
+    Args:
+        custom_flag (tuple | list): Custom flags that user wants to append to the gradle command.
+        ep (str): Episode to mux.
+        init_script (str | None): Init script that reports task events; None to not use it.
+        events_file (str | None): File where the init script writes the task events.
+
+    Returns:
+        list[str]: The command to run.
+    """
+
+    cmdfile = "./gradlew" if os.name == "posix" else "gradlew.bat"
+    command = [cmdfile, "--console=plain"]
+    if init_script and events_file:
+        command.extend(["--init-script", init_script, f"-Pmuxkt.events={events_file}"])
+    if custom_flag:
+        command.extend(custom_flag)
+    command.append(f"mux.{ep}")
+    return command
+
+
+def project_mtimes(path: str) -> dict[str, int]:
+    """
+    Get the modified time of the files that decide which tasks a project has.
+
+    Args:
+        path (str): Path of the project.
+
+    Returns:
+        dict[str, int]: Modified time of build.gradle.kts and sub.properties; 0 if a file does not exist.
+    """
+
+    mtimes = {}
+    for name in ["build.gradle.kts", "sub.properties"]:
+        try:
+            mtimes[name] = os.stat(os.path.join(path, name)).st_mtime_ns
+        except OSError:
+            mtimes[name] = 0
+    return mtimes
+
+
+def load_task_cache(cache_file: str) -> dict:
+    """
+    Load the cached task lists.
+
+    Args:
+        cache_file (str): Path of the file where task lists are cached.
+
+    Returns:
+        dict: Cached task lists keyed by absolute path of the project.
+    """
+
+    try:
+        with open(cache_file, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def get_cached_tasks(path: str, cache_file: str) -> list[str] | None:
+    """
+    Get the mux tasks of a project from the cache without running gradle.
+
+    Args:
+        path (str): Path of the project.
+        cache_file (str): Path of the file where task lists are cached.
+
+    Returns:
+        list[str] | None: Names of the mux tasks; None if the project is not cached or changed since it was cached.
+    """
+
+    cached = load_task_cache(cache_file).get(os.path.abspath(path))
+    if not cached or cached["mtimes"] != project_mtimes(path):
+        return None
+    return cached["tasks"]
+
+
+def list_gradle_tasks(path: str) -> list[str]:
+    """
+    Ask gradle for the mux tasks of a project. This starts gradle and is slow.
+
+    Args:
+        path (str): Path of the project.
+
+    Returns:
+        list[str]: Names of the mux tasks.
+
+    Raises:
+        RuntimeError: If gradle could not list the tasks.
+    """
+
+    cmdfile = "./gradlew" if os.name == "posix" else "gradlew.bat"
+    result = subprocess.run(
+        [cmdfile, "--console=plain", "tasks", "--all"],
+        cwd=path,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or result.stdout.strip())
+
+    return sorted(
+        set(re.findall(r"^(mux\.\S+?)(?: - .*)?$", result.stdout, re.MULTILINE))
+    )
+
+
+def update_task_cache(path: str, cache_file: str) -> list[str]:
+    """
+    List the mux tasks of a project with gradle and save them to the cache.
+
+    Args:
+        path (str): Path of the project.
+        cache_file (str): Path of the file where task lists are cached.
+
+    Returns:
+        list[str]: Names of the mux tasks.
+    """
+
+    mtimes = project_mtimes(path)
+    tasks = list_gradle_tasks(path)
+
+    cache = load_task_cache(cache_file)
+    cache[os.path.abspath(path)] = {"mtimes": mtimes, "tasks": tasks}
+    with open(cache_file, "w") as f:
+        json.dump(cache, f)
+
+    return tasks
+
+
+def find_missing_tasks(
+    path: str, episodes: list[str], tasks_cache: str, properties_cache: str
+) -> dict[str, list[str]]:
+    """
+    Find the episodes whose mux task does not exist without running gradle.
+
+    Args:
+        path (str): Path of the project.
+        episodes (list[str]): Episodes that will be muxed.
+        tasks_cache (str): Path of the file where task lists are cached.
+        properties_cache (str): Path of the file where mux entries of sub.properties are cached.
+
+    Returns:
+        dict[str, list[str]]: Suggestions keyed by every episode whose task does not exist; empty if all exist or if the tasks could not be known.
+    """
+
+    tasks = get_cached_tasks(path, tasks_cache)
+    if tasks is not None:
+        entries = [task.removeprefix("mux.") for task in tasks]
+    else:
+        entries = get_mux_entries(path, properties_cache)
+    if entries is None:
+        return {}
+
+    return find_invalid_tasks(episodes, entries)
@@ -0,0 +1,171 @@
+import cProfile
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from rich.console import Console
+from rich.table import Table
+from rich.text import Text
+
+console = Console()
+
+
+class Timings:
+    """
+    Records how long each phase of muxkt takes. Does nothing until enabled.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.events = []
+        self.origin = time.perf_counter()
+        self.profile = None
+
+    def enable(self, profile: bool = False) -> None:
+        """
+        Start recording the phases.
+
+        Args:
+            profile (bool): Also profile every function call with cProfile.
+
+        Returns:
+            None
+        """
+
+        self.enabled = True
+        if profile:
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+
+    def record(self, name: str, start: float, end: float, **args) -> None:
+        """
+        Record a phase that has already finished.
+
+        Args:
+            name (str): Name of the phase.
+            start (float): time.perf_counter() when the phase started.
+            end (float): time.perf_counter() when the phase ended.
+            **args: Extra information about the phase (e.g. episode).
+
+        Returns:
+            None
+        """
+
+        if not self.enabled:
+            return
+
+        self.events.append(
+            {
+                "name": name,
+                "start": start,
+                "duration": end - start,
+                "thread": threading.get_ident(),
+                "args": args,
+            }
+        )
+
+    @contextmanager
+    def phase(self, name: str, **args) -> Iterator[None]:
+        """
+        Record how long the code inside the with block takes.
+
+        Args:
+            name (str): Name of the phase.
+            **args: Extra information about the phase (e.g. episode).
+        """
+
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter(), **args)
+
+    def report(self) -> None:
+        """
+        Print the total time spent in each phase.
+
+        Returns:
+            None
+        """
+
+        if not self.enabled:
+            return
+
+        wall = time.perf_counter() - self.origin
+        phases = {}
+        for event in self.events:
+            phases.setdefault(event["name"], []).append(event["duration"])
+
+        console.rule(Text("TIMINGS:", style="bold green"))
+        table = Table(row_styles=["dim", "none"])
+        table.add_column("Phase")
+        table.add_column("Count", justify="right")
+        table.add_column("Total", justify="right")
+        table.add_column("Mean", justify="right")
+        table.add_column("Max", justify="right")
+        table.add_column("% of run", justify="right")
+
+        for name, durations in sorted(
+            phases.items(), key=lambda item: sum(item[1]), reverse=True
+        ):
+            total = sum(durations)
+            table.add_row(
+                name,
+                str(len(durations)),
+                f"{total:.3f}s",
+                f"{total / len(durations):.3f}s",
+                f"{max(durations):.3f}s",
+                f"{total / wall * 100:.1f}%",
+            )
+
+        table.add_section()
+        table.add_row("whole run", "", f"{wall:.3f}s", "", "", "100.0%")
+        console.print(table)
+
+    def write(self, path: str) -> None:
+        """
+        Write the timings to a file. Files ending with '.prof' get cProfile
+        stats; everything else gets a Chrome trace (open in chrome://tracing
+        or Perfetto).
+
+        Args:
+            path (str): Path of the file.
+
+        Returns:
+            None
+        """
+
+        if self.profile and path.endswith(".prof"):
+            self.profile.disable()
+            self.profile.dump_stats(path)
+            return
+
+        pid = os.getpid()
+        trace = {
+            "traceEvents": [
+                {
+                    "name": event["name"],
+                    "cat": "muxkt",
+                    "ph": "X",
+                    "ts": (event["start"] - self.origin) * 1e6,
+                    "dur": event["duration"] * 1e6,
+                    "pid": pid,
+                    "tid": event["thread"],
+                    "args": event["args"],
+                }
+                for event in self.events
+            ],
+            "displayTimeUnit": "ms",
+        }
+        with open(path, "w") as f:
+            json.dump(trace, f)
+
+
+timings = Timings()
@@ -1,3 +1,4 @@
+import configparser
 import os
 import sys
 from shutil import which
@@ -36,6 +37,30 @@ def path_is_valid_subkt(path: str) -> bool:
     return True
 
 
+def get_app_files(config_file_path: str) -> dict[str, str]:
+    """
+    Get the paths of the files muxkt keeps in its config folder.
+
+    Args:
+        config_file_path (str): The config folder.
+
+    Returns:
+        dict[str, str]: Path of every file keyed by what it is used for.
+    """
+
+    return {
+        "config_file": os.path.join(config_file_path, "config"),
+        "output_file": os.path.join(config_file_path, "output.txt"),
+        "verify_cache": os.path.join(config_file_path, "verify_cache.json"),
+        "log_dir": os.path.join(config_file_path, "logs"),
+        "discover_cache": os.path.join(config_file_path, "discover_cache.json"),
+        "properties_cache": os.path.join(config_file_path, "properties_cache.json"),
+        "tasks_cache": os.path.join(config_file_path, "tasks_cache.json"),
+        "durations_file": os.path.join(config_file_path, "durations.json"),
+        "usage_file": os.path.join(config_file_path, "usage.jsonl"),
+    }
+
+
 def exit_with_msg(message: str) -> None:
     """
     Exit the program with a styled error message.
@@ -101,3 +126,42 @@ def msg_in_box(title: str, message: str | Text) -> None:
             title_align="left",
         ),
     )
+
+
+def format_size(size: float) -> str:
+    """
+    Format a number of bytes in a human readable way (e.g. 1.5 GiB).
+
+    Args:
+        size (float): Number of bytes.
+
+    Returns:
+        str: The formatted size.
+    """
+
+    for unit in ["B", "KiB", "MiB", "GiB"]:
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}" if unit != "B" else f"{size:.0f} B"
+        size /= 1024
+    return f"{size:.1f} TiB"
+
+
+def arc_name(config: configparser.ConfigParser, project_name: str, arc: str) -> str:
+    """
+    Get the name that the mux tasks of an arc of an alternate project start with.
+
+    Args:
+        config (configparser.ConfigParser): The config.
+        project_name (str): Name of the project.
+        arc (str): Folder of the arc (e.g. '01 S1').
+
+    Returns:
+        str: Name of the arc in the mux tasks (e.g. 's1').
+    """
+
+    name = arc[3:].replace(" ", "").lower()
+
+    exceptions_section = f"{project_name}_exceptions"
+    if config.has_option(exceptions_section, name):
+        name = config.get(exceptions_section, name)
+    return name
@@ -0,0 +1,368 @@
+import json
+import os
+import re
+import subprocess
+import sys
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import click
+from rich.console import Console
+from rich.table import Table
+from rich.text import Text
+
+from .utils import exit_with_msg
+
+console = Console()
+
+# zlib releases the GIL while hashing large buffers, so reading in big chunks
+# lets several files be hashed in parallel from a thread pool.
+CHUNK_SIZE = 8 * 1024 * 1024
+
+
+@click.command()
+@click.pass_context
+@click.help_option("--help", "-h")
+@click.argument(
+    "files",
+    required=False,
+    nargs=-1,
+    type=click.Path(exists=True, dir_okay=False),
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=min(8, os.cpu_count() or 1),
+    show_default=True,
+    help="Number of files to verify at the same time.",
+)
+def verify(ctx: click.Context, files: tuple, jobs: int) -> None:
+    """Verify CRC and track list of muxed files. Defaults to the output of last mux."""
+    """
+    Args:
+        ctx (click.Context): Context passed by click from the entry point.
+        files (tuple): Files to verify; empty if files should be taken from the output of last mux.
+
+    Options:
+        jobs (int): Number of files that are hashed at the same time.
+
+    Returns:
+        None
+    """
+
+    expected_tracks = None
+    if not files:
+        config = ctx.obj["config"]
+        base = config.get("History", "path", fallback=os.getcwd())
+        files, expected_tracks = get_mux_results(ctx.obj["output_file"], base)
+        if not files:
+            exit_with_msg("No output files found in the output of last mux.")
+
+    results = verify_files(files, ctx.obj["verify_cache"], jobs, expected_tracks)
+    show_verify_results(results)
+
+    if not all(result["ok"] for result in results):
+        sys.exit(1)
+
+
+def get_mux_results(output_file: str, base: str) -> tuple[list[str], list[str]]:
+    """
+    Collect the output files and the track list from the output of a mux.
+
+    Args:
+        output_file (str): The path to the file where output of the mux is stored.
+        base (str): Directory that relative output paths are resolved against.
+
+    Returns:
+        list[str]: Paths of the files that were muxed.
+        list[str]: Types of the tracks that SubKt reported in the track list.
+    """
+
+    try:
+        with open(output_file, "r") as f:
+            lines = f.read()
+    except FileNotFoundError:
+        exit_with_msg("Output file not found.")
+
+    files = [
+        os.path.join(base, match.group(1))
+        for match in re.finditer(r"Output: (.*mkv)", lines)
+    ]
+    tracks = [
+        match.group(1)
+        for match in re.finditer(r"Track (\w+) \(.*?\) \[.*?\]$", lines, re.M)
+    ]
+
+    return files, tracks
+
+
+def crc32_file(path: str) -> str:
+    """
+    Compute the CRC32 of a file.
+
+    Args:
+        path (str): Path of the file.
+
+    Returns:
+        str: CRC32 of the file as 8 uppercase hex characters.
+    """
+
+    crc = 0
+    buffer = bytearray(CHUNK_SIZE)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        while size := f.readinto(buffer):
+            crc = zlib.crc32(view[:size], crc)
+
+    return f"{crc:08X}"
+
+
+def get_crc_tag(path: str) -> str | None:
+    """
+    Get the CRC tag from the file name (e.g. '[1A2B3C4D]').
+
+    Args:
+        path (str): Path of the file.
+
+    Returns:
+        str | None: The CRC in the file name in uppercase; None if the file name has no CRC.
+    """
+
+    matches = re.findall(r"\[([0-9A-Fa-f]{8})\]", os.path.basename(path))
+    return matches[-1].upper() if matches else None
+
+
+def mkvmerge_tracks(path: str) -> list[str] | None:
+    """
+    Get the types of tracks in the file using 'mkvmerge -J'.
+
+    Args:
+        path (str): Path of the file.
+
+    Returns:
+        list[str] | None: Types of the tracks in the file; None if mkvmerge could not identify the file.
+    """
+
+    try:
+        result = subprocess.run(
+            ["mkvmerge", "-J", path], capture_output=True, text=True, timeout=60
+        )
+        info = json.loads(result.stdout)
+    except (OSError, subprocess.TimeoutExpired, json.JSONDecodeError):
+        return None
+
+    return [track["type"] for track in info.get("tracks", [])]
+
+
+def normalize_track_type(track_type: str) -> str:
+    """
+    Normalize track type so that SubKt and mkvmerge names can be compared.
+    (e.g. 'subtitles' and 'subtitle' are same.)
+    """
+
+    return track_type.lower().rstrip("s")
+
+
+def verify_file(path: str, cached: dict | None) -> dict:
+    """
+    Compute CRC and track list of a file unless the cached entry is still valid.
+
+    Args:
+        path (str): Path of the file.
+        cached (dict | None): Cached entry of the file; None if the file is not in the cache.
+
+    Returns:
+        dict: Entry with size, mtime, crc and tracks of the file; error instead if the file could not be read.
+    """
+
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return {"error": "missing", "cached": False}
+    except OSError:
+        return {"error": "unreadable", "cached": False}
+
+    if (
+        cached
+        and cached["tracks"] is not None
+        and cached["size"] == stat.st_size
+        and cached["mtime_ns"] == stat.st_mtime_ns
+    ):
+        return cached | {"cached": True}
+
+    try:
+        crc = crc32_file(path)
+    except FileNotFoundError:
+        return {"error": "missing", "cached": False}
+    except OSError:
+        return {"error": "unreadable", "cached": False}
+
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "crc": crc,
+        "tracks": mkvmerge_tracks(path),
+        "cached": False,
+    }
+
+
+def verify_files(
+    files: list[str] | tuple,
+    cache_file: str,
+    jobs: int,
+    expected_tracks: list[str] | None = None,
+) -> list[dict]:
+    """
+    Verify the CRC and track list of the files in parallel.
+
+    Args:
+        files (list[str] | tuple): Paths of the files to verify.
+        cache_file (str): Path of the file where results are cached.
+        jobs (int): Number of files that are verified at the same time.
+        expected_tracks (list[str] | None): Track types that every file should have; None to skip the check.
+
+    Returns:
+        list[dict]: Result of verification for every file in the same order as the files.
+    """
+
+    cache = load_verify_cache(cache_file)
+    paths = [os.path.abspath(file) for file in files]
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        entries = list(
+            executor.map(lambda path: verify_file(path, cache.get(path)), paths)
+        )
+
+    results = []
+    for path, entry in zip(paths, entries):
+        if "error" in entry:
+            cache.pop(path, None)
+            results.append(
+                {
+                    "file": path,
+                    "error": entry["error"],
+                    "crc": None,
+                    "expected_crc": get_crc_tag(path),
+                    "crc_ok": False,
+                    "tracks": None,
+                    "tracks_ok": False,
+                    "cached": False,
+                    "ok": False,
+                }
+            )
+            continue
+
+        cache[path] = {k: v for k, v in entry.items() if k != "cached"}
+
+        expected_crc = get_crc_tag(path)
+        crc_ok = expected_crc is None or expected_crc == entry["crc"]
+
+        tracks = entry["tracks"]
+        if tracks is None:
+            tracks_ok = False
+        elif expected_tracks is None:
+            tracks_ok = True
+        else:
+            tracks_ok = sorted(map(normalize_track_type, tracks)) == sorted(
+                map(normalize_track_type, expected_tracks)
+            )
+
+        results.append(
+            {
+                "file": path,
+                "crc": entry["crc"],
+                "expected_crc": expected_crc,
+                "crc_ok": crc_ok,
+                "tracks": tracks,
+                "tracks_ok": tracks_ok,
+                "cached": entry["cached"],
+                "ok": crc_ok and tracks_ok,
+            }
+        )
+
+    save_verify_cache(cache, cache_file)
+    return results
+
+
+def show_verify_results(results: list[dict]) -> None:
+    """
+    Print the results of the verification in a table.
+
+    Args:
+        results (list[dict]): Results returned by verify_files.
+
+    Returns:
+        None
+    """
+
+    console.rule(Text("VERIFICATION:", style="bold green"))
+    table = Table(row_styles=["dim", "none"])
+    table.add_column("File")
+    table.add_column("CRC")
+    table.add_column("Tracks")
+    table.add_column("Status")
+
+    for result in results:
+        if result.get("error"):
+            table.add_row(
+                os.path.basename(result["file"]),
+                f"[bold magenta]File is {result['error']}[/bold magenta]",
+                "",
+                "[bold red]FAILED[/bold red]",
+            )
+            continue
+
+        crc = result["crc"]
+        if result["expected_crc"] and not result["crc_ok"]:
+            crc = f"[bold magenta]{crc} (expected {result['expected_crc']})[/bold magenta]"
+
+        if result["tracks"] is None:
+            tracks = "[bold magenta]mkvmerge could not read the file[/bold magenta]"
+        else:
+            tracks = ", ".join(result["tracks"])
+            if not result["tracks_ok"]:
+                tracks = f"[bold magenta]{tracks}[/bold magenta]"
+
+        status = "[green]OK[/green]" if result["ok"] else "[bold red]FAILED[/bold red]"
+        if result["cached"]:
+            status += " [dim](cached)[/dim]"
+
+        table.add_row(os.path.basename(result["file"]), crc, tracks, status)
+
+    console.print(table)
+    console.print()
+
+
+def load_verify_cache(cache_file: str) -> dict:
+    """
+    Load the cached results of previous verifications.
+
+    Args:
+        cache_file (str): Path of the file where results are cached.
+
+    Returns:
+        dict: Cached entries keyed by absolute path of the file.
+    """
+
+    try:
+        with open(cache_file, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_verify_cache(cache: dict, cache_file: str) -> None:
+    """
+    Save the results of verifications to the cache.
+
+    Args:
+        cache (dict): Cached entries keyed by absolute path of the file.
+        cache_file (str): Path of the file where results are cached.
+
+    Returns:
+        None
+    """
+
+    with open(cache_file, "w") as f:
+        json.dump(cache, f)
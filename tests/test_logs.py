@@ -0,0 +1,39 @@
+import os
+from datetime import datetime, timedelta
+
+from muxkt.logs import TIME_FORMAT, prune_logs
+
+
+def write_log(log_dir, days_ago, ep, size):
+    when = (datetime.now() - timedelta(days=days_ago)).strftime(TIME_FORMAT)
+    path = log_dir / "komi" / f"{when}_{ep}.txt"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    return str(path)
+
+
+def test_prune_removes_old_logs(tmp_path):
+    new = write_log(tmp_path, 1, "01", 10)
+    old = write_log(tmp_path, 100, "02", 10)
+
+    assert prune_logs(str(tmp_path), 90, 1000) == (1, 10)
+    assert os.path.exists(new)
+    assert not os.path.exists(old)
+
+
+def test_prune_removes_oldest_logs_over_size(tmp_path):
+    newest = write_log(tmp_path, 1, "01", 400)
+    middle = write_log(tmp_path, 2, "02", 400)
+    oldest = write_log(tmp_path, 3, "03", 300)
+
+    assert prune_logs(str(tmp_path), 90, 1000) == (1, 300)
+    assert os.path.exists(newest)
+    assert os.path.exists(middle)
+    assert not os.path.exists(oldest)
+
+
+def test_prune_keeps_log_that_was_just_archived(tmp_path):
+    archived = write_log(tmp_path, 0, "01", 2000)
+
+    assert prune_logs(str(tmp_path), 90, 1000, keep=archived) == (0, 0)
+    assert os.path.exists(archived)
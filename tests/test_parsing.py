@@ -0,0 +1,66 @@
+import tracemalloc
+
+import pytest
+
+from muxkt import parsing
+
+LOG_SIZE = 16 * 1024 * 1024
+
+# Peak memory allowed while parsing a log of LOG_SIZE. Reading the whole log
+# at once takes a few times LOG_SIZE.
+MAX_PEAK = LOG_SIZE // 4
+
+NOISE = "DEBUG [org.gradle.internal.operations] Completing Build operation 'Run build' ........\n"
+
+
+@pytest.fixture
+def large_log(tmp_path, monkeypatch):
+    """A failed mux log of LOG_SIZE with a long script compilation error block."""
+
+    # A small chunk keeps the test quick while still reading the log in many chunks.
+    monkeypatch.setattr(parsing, "CHUNK_SIZE", 256 * 1024)
+
+    path = tmp_path / "output.txt"
+    with open(path, "w") as f:
+        f.write("Validating fonts for 01 dialogue.ass...\n")
+        f.write("  warning: font Arial not found\n")
+        f.write("request failed: 503\n")
+        f.write("Script compilation errors:\n")
+        for i in range(10_000):
+            f.write(f"  Line {i}: unresolved reference\n")
+        f.write("10000 errors\n")
+        while f.tell() < LOG_SIZE:
+            f.write(NOISE * 1000)
+        f.write("FAILURE: Build failed with an exception.\n")
+    return str(path)
+
+
+def peak_memory(function, *args):
+    tracemalloc.start()
+    try:
+        result = function(*args)
+        return result, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_parse_failures_memory(large_log):
+    (failures, errors), peak = peak_memory(parsing.parse_failures, large_log)
+
+    assert peak < MAX_PEAK
+    assert failures
+    assert len(errors) == parsing.MAX_COMPILATION_ERROR_LINES + 1
+    assert errors[-1].endswith("more lines in the log")
+
+
+def test_parse_warnings_memory(large_log):
+    warnings, peak = peak_memory(parsing.parse_warnings, large_log)
+
+    assert peak < MAX_PEAK
+    assert warnings == [["Validating fonts for 01 dialogue.ass", "font Arial not found"]]
+
+
+def test_find_transient_failures_memory(large_log):
+    _, peak = peak_memory(parsing.find_transient_failures, large_log)
+
+    assert peak < MAX_PEAK
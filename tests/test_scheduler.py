@@ -0,0 +1,16 @@
+from muxkt.scheduler import DEFAULT_JOB_MEMORY, Scheduler
+
+
+def test_small_peak_does_not_lower_job_memory():
+    scheduler = Scheduler(4)
+    # Only the gradle client is measured when a daemon does the work.
+    scheduler.record_memory(200 * 1024 * 1024)
+
+    assert scheduler.job_memory() == DEFAULT_JOB_MEMORY
+
+
+def test_large_peak_raises_job_memory():
+    scheduler = Scheduler(4)
+    scheduler.record_memory(DEFAULT_JOB_MEMORY * 2)
+
+    assert scheduler.job_memory() == DEFAULT_JOB_MEMORY * 2